@@ -1,5 +1,9 @@
+import functools
 import math
-from typing import Any
+from typing import Any, Callable, Tuple
+
+import numpy as np
+
 
 def _sign(x):
     if x > 0:
@@ -7,10 +11,65 @@ def _sign(x):
     return -1
 
 
+def _sign_array(x):
+    return np.where(x > 0, 1.0, -1.0)
+
+
+def _is_array(x) -> bool:
+    return isinstance(x, (np.ndarray, list, tuple, DualArray))
+
+
+def _primitive(fn):
+    """
+    Lets the DualNumber elementary functions also accept the other autodiff number types,
+    which provide their own function of the same name
+    """
+    @functools.wraps(fn)
+    def wrapper(n):
+        if isinstance(n, (TapeVariable, TaylorNumber)):
+            return getattr(type(n), fn.__name__)(n)
+        return fn(n)
+
+    return wrapper
+
+
+def _as_dual(n) -> 'DualNumber':
+    if isinstance(n, DualNumber):
+        return n
+    return DualNumber(n)
+
+
 class DualNumber:
+    """
+    A dual number real + dual * e, where e^2 = 0, used for forward mode automatic differentiation.
+    Constructing one from an array gives a DualArray instead
+    """
     real: float
     dual: float
 
+    # elementary functions applied to the real part, subclasses swap these for array versions
+    _sin = staticmethod(math.sin)
+    _cos = staticmethod(math.cos)
+    _exp = staticmethod(math.exp)
+    _log = staticmethod(math.log)
+    _pow = staticmethod(math.pow)
+    _fabs = staticmethod(math.fabs)
+    _signum = staticmethod(_sign)
+
+    # when combining two kinds of dual numbers the result takes the higher ranked type
+    _rank = 0
+
+    def __new__(cls, real: Any = 0.0, dual: Any = None):
+        if cls is DualNumber:
+            if isinstance(real, (TapeVariable, TaylorNumber)) and dual is None:
+                # Dual(x) inside a function being differentiated by another autodiff type
+                return real
+            if isinstance(real, DualNumber):
+                cls = type(real)
+            elif _is_array(real) or _is_array(dual):
+                cls = DualArray
+        return super().__new__(cls)
+
     def __init__(self, real: Any = 0.0, dual: Any = None):
         if dual is None:
             if isinstance(real, DualNumber):
@@ -23,67 +82,92 @@ class DualNumber:
         self.real = real
         self.dual = dual
 
-    def __add__(self, other: Any):
+    def _coerce(self, other: Any):
         if not isinstance(other, DualNumber):
-            other = DualNumber(other)
+            other = type(self)(other)
+
+        if type(self) is not type(other) and max(self._rank, other._rank) >= MultiDual._rank:
+            # a scalar dual number without a dual part, such as Dual.sin(t) of a float, is only a constant
+            low = other if other._rank < self._rank else self
+            if np.ndim(low.real) != 0 or np.any(low.dual != 0):
+                raise TypeError("cannot mix a MultiDual with other kinds of dual numbers")
+
+        cls = type(self) if self._rank >= other._rank else type(other)
+        return other, cls
 
-        return DualNumber(self.real + other.real, self.dual + other.dual)
+    def __add__(self, other: Any):
+        other, cls = self._coerce(other)
+
+        return cls(self.real + other.real, self.dual + other.dual)
 
     def __sub__(self, other: Any):
-        if not isinstance(other, DualNumber):
-            other = DualNumber(other)
+        other, cls = self._coerce(other)
 
-        return DualNumber(self.real - other.real, self.dual - other.dual)
+        return cls(self.real - other.real, self.dual - other.dual)
 
     def __mul__(self, other: Any):
-        if not isinstance(other, DualNumber):
-            other = DualNumber(other)
+        other, cls = self._coerce(other)
 
-        return DualNumber(self.real * other.real, self.dual * other.real + self.real * other.dual)
+        return cls(self.real * other.real, self.dual * other.real + self.real * other.dual)
 
     def __truediv__(self, other: Any):
-        if not isinstance(other, DualNumber):
-            other = DualNumber(other)
+        other, cls = self._coerce(other)
+
+        return cls(self.real / other.real, (self.dual * other.real - self.real * other.dual) / other.real ** 2)
+
+    def __radd__(self, other: Any):
+        return self + other
+
+    def __rsub__(self, other: Any):
+        return -self + other
 
-        return DualNumber(self.real / other.real, (self.dual * other.real - self.real * other.dual) / other.real ** 2)
+    def __rmul__(self, other: Any):
+        return self * other
+
+    def __rtruediv__(self, other: Any):
+        other, cls = self._coerce(other)
+        return other / self
+
+    def __neg__(self):
+        return type(self)(-self.real, -self.dual)
 
     @staticmethod
+    @_primitive
     def sin(n):
-        if not isinstance(n, DualNumber):
-            n = DualNumber(n)
+        n = _as_dual(n)
 
-        return DualNumber(math.sin(n.real), n.dual * math.cos(n.real))
+        return type(n)(n._sin(n.real), n.dual * n._cos(n.real))
 
     @staticmethod
+    @_primitive
     def cos(n):
-        if not isinstance(n, DualNumber):
-            n = DualNumber(n)
+        n = _as_dual(n)
 
-        return DualNumber(math.cos(n.real), -n.dual * math.sin(n.real))
+        return type(n)(n._cos(n.real), -n.dual * n._sin(n.real))
 
     @staticmethod
+    @_primitive
     def exp(n):
-        if not isinstance(n, DualNumber):
-            n = DualNumber(n)
+        n = _as_dual(n)
 
-        return DualNumber(math.exp(n.real), n.dual * math.exp(n.real))
+        return type(n)(n._exp(n.real), n.dual * n._exp(n.real))
 
     @staticmethod
+    @_primitive
     def ln(n):
-        if not isinstance(n, DualNumber):
-            n = DualNumber(n)
+        n = _as_dual(n)
 
-        return DualNumber(math.log(n.real), n.dual / n.real)
+        return type(n)(n._log(n.real), n.dual / n.real)
 
     def __pow__(self, k):
-        return DualNumber(math.pow(self.real, k), self.dual * k * math.pow(self.real, k - 1))
+        return type(self)(self._pow(self.real, k), self.dual * k * self._pow(self.real, k - 1))
 
     @staticmethod
+    @_primitive
     def abs(n):
-        if not isinstance(n, DualNumber):
-            n = DualNumber(n)
+        n = _as_dual(n)
 
-        return DualNumber(math.fabs(n.real), n.dual * _sign(n.real))
+        return type(n)(n._fabs(n.real), n.dual * n._signum(n.real))
 
     def __iter__(self):
         yield self.real
@@ -95,6 +179,13 @@ class DualNumber:
 
     @staticmethod
     def autodiff(fn):
+        """
+        Returns a function giving the (value, derivative) dual number of fn,
+        passing an array evaluates every point in one pass and returns a DualArray
+
+        :param fn: Function written with DualNumber operations
+        :return: The differentiating function
+        """
         def diff(x):
             return fn(DualNumber(x, 1))
 
@@ -107,6 +198,636 @@ class DualNumber:
         return f"DualNumber(real={self.real}, dual={self.dual})"
 
 
+class DualArray(DualNumber):
+    """
+    A dual number whose real and dual parts are float64 numpy arrays of the same shape,
+    every operation is applied element-wise with numpy
+    """
+    real: np.ndarray
+    dual: np.ndarray
+
+    _sin = staticmethod(np.sin)
+    _cos = staticmethod(np.cos)
+    _exp = staticmethod(np.exp)
+    _log = staticmethod(np.log)
+    _pow = staticmethod(np.power)
+    _fabs = staticmethod(np.abs)
+    _signum = staticmethod(_sign_array)
+
+    _rank = 1
+
+    # make numpy arrays defer to our reflected operators
+    __array_ufunc__ = None
+
+    def __init__(self, real: Any = 0.0, dual: Any = None):
+        if dual is None and isinstance(real, DualNumber):
+            real, dual = real.real, real.dual
+
+        real = np.asarray(real, dtype=np.float64)
+        if dual is None:
+            dual = np.zeros_like(real)
+        real, dual = np.broadcast_arrays(real, np.asarray(dual, dtype=np.float64))
+
+        self.real = real
+        self.dual = dual
+
+    def __len__(self):
+        return len(self.real)
+
+    def __getitem__(self, location):
+        return DualNumber(self.real[location], self.dual[location])
+
+    def __str__(self):
+        return f"DualArray({self.real} + {self.dual}e)"
+
+    def __repr__(self):
+        return f"DualArray(real={self.real!r}, dual={self.dual!r})"
+
+
+class MultiDual(DualNumber):
+    """
+    A dual number with a vector of infinitesimals, real + dual . (e_1, ..., e_n),
+    carrying the partial derivatives with respect to n inputs so a full gradient takes one pass.
+
+    The real part keeps a trailing axis of length 1 so it broadcasts against the (..., n) dual part,
+    use *value* and *gradient* for the user facing shapes
+    """
+    real: np.ndarray
+    dual: np.ndarray
+
+    _sin = staticmethod(np.sin)
+    _cos = staticmethod(np.cos)
+    _exp = staticmethod(np.exp)
+    _log = staticmethod(np.log)
+    _pow = staticmethod(np.power)
+    _fabs = staticmethod(np.abs)
+    _signum = staticmethod(_sign_array)
+
+    _rank = 2
+
+    # numpy functions applied to a MultiDual, so right hand sides written with np.exp etc. can be differentiated
+    _UNARY = {
+        np.exp: DualNumber.exp,
+        np.log: DualNumber.ln,
+        np.sin: DualNumber.sin,
+        np.cos: DualNumber.cos,
+        np.sqrt: lambda n: n ** 0.5,
+        np.absolute: DualNumber.abs,
+        np.negative: lambda n: -n,
+    }
+    # (operator, reflected operator) for when the MultiDual is the right operand
+    _BINARY = {
+        np.add: ('__add__', '__radd__'),
+        np.subtract: ('__sub__', '__rsub__'),
+        np.multiply: ('__mul__', '__rmul__'),
+        np.true_divide: ('__truediv__', '__rtruediv__'),
+    }
+
+    def __array_ufunc__(self, ufunc, method, *inputs, **kwargs):
+        if method != '__call__' or kwargs:
+            return NotImplemented
+        if ufunc in MultiDual._UNARY:
+            return MultiDual._UNARY[ufunc](inputs[0])
+        if ufunc in MultiDual._BINARY:
+            left, right = inputs
+            name, reflected = MultiDual._BINARY[ufunc]
+            if left is self:
+                return getattr(self, name)(right)
+            return getattr(self, reflected)(left)
+        if ufunc is np.power and inputs[0] is self:
+            return self ** inputs[1]
+        return NotImplemented
+
+    def __init__(self, real: Any = 0.0, dual: Any = None):
+        # without a dual part this is a constant, otherwise real already has its trailing axis
+        if dual is None:
+            if isinstance(real, DualNumber):
+                real, dual = real.real, real.dual
+            else:
+                real = np.asarray(real, dtype=np.float64)[..., np.newaxis]
+                dual = np.zeros(1)
+
+        self.real = np.asarray(real, dtype=np.float64)
+        self.dual = np.asarray(dual, dtype=np.float64)
+
+    @staticmethod
+    def variables(x) -> np.ndarray:
+        """
+        Creates one MultiDual per input, each seeded with its own unit infinitesimal
+
+        :param x: (n,) input point, or (m, n) batch of input points
+        :return: Object array of the n input variables
+        """
+        x = np.asarray(x, dtype=np.float64)
+        n = x.shape[-1]
+        seeds = np.broadcast_to(np.eye(n), x.shape[:-1] + (n, n))
+
+        variables = np.empty(n, dtype=object)
+        for i in range(n):
+            variables[i] = MultiDual(x[..., i:i + 1], seeds[..., i, :])
+        return variables
+
+    @property
+    def value(self) -> np.ndarray:
+        return self.real[..., 0]
+
+    @property
+    def gradient(self) -> np.ndarray:
+        return np.broadcast_to(self.dual, self.real.shape[:-1] + self.dual.shape[-1:])
+
+    def __iter__(self):
+        yield self.value
+        yield self.gradient
+
+    def __str__(self):
+        return f"MultiDual({self.value} + {self.gradient}e)"
+
+    def __repr__(self):
+        return f"MultiDual(value={self.value!r}, gradient={self.gradient!r})"
+
+
+def _evaluate(fn: Callable, x) -> Tuple[np.ndarray, np.ndarray]:
+    x = np.asarray(x, dtype=np.float64)
+    outputs = fn(MultiDual.variables(x))
+
+    scalar = not isinstance(outputs, (list, tuple, np.ndarray))
+    if scalar:
+        outputs = [outputs]
+
+    batch, n = x.shape[:-1], x.shape[-1]
+    values = []
+    rows = []
+    for output in outputs:
+        if isinstance(output, MultiDual):
+            values.append(np.broadcast_to(output.value, batch))
+            rows.append(np.broadcast_to(output.dual, batch + (n,)))
+        else:
+            # the output does not depend on the inputs
+            values.append(np.broadcast_to(np.asarray(output, dtype=np.float64), batch))
+            rows.append(np.zeros(batch + (n,)))
+
+    if scalar:
+        return values[0], rows[0]
+    return np.stack(values, axis=-1), np.stack(rows, axis=-2)
+
+
+def gradient(fn: Callable, x) -> np.ndarray:
+    """
+    The gradient of a scalar function of n inputs, computed in one forward pass.
+    fn receives an object array of the inputs and should use DualNumber operations
+
+    :param fn: Function of the form (inputs) -> number
+    :param x: (n,) point, or (m, n) batch of points
+    :return: (n,) gradient, or (m, n) gradients
+    """
+    result = jacobian(fn, x)
+    if result.shape != np.shape(x):
+        raise ValueError("gradient needs a function with a single output, use jacobian")
+    return result
+
+
+def jacobian(fn: Callable, x) -> np.ndarray:
+    """
+    The jacobian of a function of n inputs returning k outputs, computed in one forward pass.
+    A batch of points is evaluated together, fn receives an object array of the inputs
+
+    :param fn: Function of the form (inputs) -> sequence of k numbers
+    :param x: (n,) point, or (m, n) batch of points
+    :return: (k, n) jacobian, or (m, k, n) jacobians
+    """
+    return _evaluate(fn, x)[1]
+
+
+def newton(fn: Callable, x0, tolerance: float = 1e-10, max_iterations: int = 50) -> np.ndarray:
+    """
+    Solves fn(x) = 0 for a system of n equations in n unknowns with Newton's method,
+    using jacobians from MultiDual numbers
+
+    :param fn: Function of the form (inputs) -> sequence of n numbers
+    :param x0: Initial guess
+    :param tolerance: Stop when the step is smaller than this
+    :param max_iterations: Maximum number of newton steps
+    :return: The root
+    """
+    x = np.array(x0, dtype=np.float64)
+    for _ in range(max_iterations):
+        values, jac = _evaluate(fn, x)
+        step = np.linalg.solve(np.atleast_2d(jac), np.atleast_1d(values))
+        x = x - step
+        if np.max(np.abs(step)) <= tolerance:
+            return x
+
+    raise ArithmeticError(f"newton's method did not converge in {max_iterations} iterations")
+
+
+class Tape:
+    """
+    A reverse mode automatic differentiation tape (Wengert list).
+
+    Every operation on a TapeVariable appends one record holding the result value,
+    the indices of up to two parent records and the local partial derivatives to them.
+    The records are kept in growable numpy arrays rather than a graph of python objects
+    """
+
+    def __init__(self, capacity: int = 1024):
+        self._values = np.empty(capacity)
+        self._parents = np.empty((capacity, 2), dtype=np.intp)
+        self._partials = np.empty((capacity, 2))
+        self._size = 0
+
+    def __len__(self):
+        return self._size
+
+    def _push(self, value: float, parents: Tuple[int, int] = (-1, -1),
+              partials: Tuple[float, float] = (0.0, 0.0)) -> 'TapeVariable':
+        if self._size == len(self._values):
+            capacity = 2 * len(self._values)
+            self._values = np.resize(self._values, capacity)
+            self._parents = np.resize(self._parents, (capacity, 2))
+            self._partials = np.resize(self._partials, (capacity, 2))
+
+        index = self._size
+        self._values[index] = value
+        self._parents[index] = parents
+        self._partials[index] = partials
+        self._size += 1
+        return TapeVariable(self, index, value)
+
+    def variable(self, value: float) -> 'TapeVariable':
+        """
+        Records an input variable
+
+        :param value: The value of the input
+        :return: The variable to compute with
+        """
+        return self._push(float(value))
+
+    def variables(self, values) -> np.ndarray:
+        """
+        Records a vector of input variables
+
+        :param values: (n,) input values
+        :return: Object array of the n variables
+        """
+        values = np.asarray(values, dtype=np.float64).reshape(-1)
+        variables = np.empty(len(values), dtype=object)
+        for i, value in enumerate(values):
+            variables[i] = self.variable(value)
+        return variables
+
+    def gradient(self, output: 'TapeVariable', inputs=None) -> np.ndarray:
+        """
+        Computes d(output)/d(record) for every record in one backward sweep over the tape
+
+        :param output: The scalar result to differentiate
+        :param inputs: Variables to return the derivatives of, defaults to every record
+        :return: The derivatives, in the order of *inputs*
+        """
+        adjoints = np.zeros(self._size)
+        if isinstance(output, TapeVariable):
+            if output.tape is not self:
+                raise ValueError("output was not recorded on this tape")
+
+            # plain lists are faster than numpy scalars inside the python loop
+            parents = self._parents[:output.index + 1].tolist()
+            partials = self._partials[:output.index + 1].tolist()
+            adjoint = [0.0] * (output.index + 1)
+            adjoint[output.index] = 1.0
+            for i in range(output.index, -1, -1):
+                a = adjoint[i]
+                if a == 0.0:
+                    continue
+                (p, q), (dp, dq) = parents[i], partials[i]
+                if p >= 0:
+                    adjoint[p] += a * dp
+                if q >= 0:
+                    adjoint[q] += a * dq
+            adjoints[:output.index + 1] = adjoint
+
+        if inputs is None:
+            return adjoints
+        return np.array([adjoints[variable.index] for variable in inputs])
+
+    def clear(self):
+        self._size = 0
+
+
+def _as_tape_operand(self: 'TapeVariable', other: Any):
+    if isinstance(other, TapeVariable):
+        if other.tape is not self.tape:
+            raise ValueError("cannot combine variables from different tapes")
+        return other
+    if isinstance(other, DualNumber):
+        raise TypeError("cannot mix a TapeVariable with dual numbers")
+    return float(other)
+
+
+class TapeVariable:
+    """
+    A scalar recorded on a Tape, supporting the same operations as DualNumber
+    """
+    __slots__ = ("tape", "index", "value")
+
+    def __init__(self, tape: Tape, index: int, value: float):
+        self.tape = tape
+        self.index = index
+        self.value = value
+
+    def _unary(self, value: float, partial: float) -> 'TapeVariable':
+        return self.tape._push(value, (self.index, -1), (partial, 0.0))
+
+    def __add__(self, other: Any):
+        other = _as_tape_operand(self, other)
+        if isinstance(other, TapeVariable):
+            return self.tape._push(self.value + other.value, (self.index, other.index), (1.0, 1.0))
+        return self._unary(self.value + other, 1.0)
+
+    def __sub__(self, other: Any):
+        other = _as_tape_operand(self, other)
+        if isinstance(other, TapeVariable):
+            return self.tape._push(self.value - other.value, (self.index, other.index), (1.0, -1.0))
+        return self._unary(self.value - other, 1.0)
+
+    def __mul__(self, other: Any):
+        other = _as_tape_operand(self, other)
+        if isinstance(other, TapeVariable):
+            return self.tape._push(self.value * other.value, (self.index, other.index), (other.value, self.value))
+        return self._unary(self.value * other, other)
+
+    def __truediv__(self, other: Any):
+        other = _as_tape_operand(self, other)
+        if isinstance(other, TapeVariable):
+            return self.tape._push(self.value / other.value, (self.index, other.index),
+                                   (1 / other.value, -self.value / other.value ** 2))
+        return self._unary(self.value / other, 1 / other)
+
+    def __radd__(self, other: Any):
+        return self + other
+
+    def __rsub__(self, other: Any):
+        return self._unary(float(other) - self.value, -1.0)
+
+    def __rmul__(self, other: Any):
+        return self * other
+
+    def __rtruediv__(self, other: Any):
+        other = float(other)
+        return self._unary(other / self.value, -other / self.value ** 2)
+
+    def __neg__(self):
+        return self._unary(-self.value, -1.0)
+
+    def __pow__(self, k):
+        k = _as_tape_operand(self, k)
+        if isinstance(k, TapeVariable):
+            value = math.pow(self.value, k.value)
+            return self.tape._push(value, (self.index, k.index),
+                                   (k.value * math.pow(self.value, k.value - 1), value * math.log(self.value)))
+        return self._unary(math.pow(self.value, k), k * math.pow(self.value, k - 1))
+
+    def __rpow__(self, k):
+        value = math.pow(k, self.value)
+        return self._unary(value, value * math.log(k))
+
+    @staticmethod
+    def sin(n: 'TapeVariable'):
+        return n._unary(math.sin(n.value), math.cos(n.value))
+
+    @staticmethod
+    def cos(n: 'TapeVariable'):
+        return n._unary(math.cos(n.value), -math.sin(n.value))
+
+    @staticmethod
+    def exp(n: 'TapeVariable'):
+        value = math.exp(n.value)
+        return n._unary(value, value)
+
+    @staticmethod
+    def ln(n: 'TapeVariable'):
+        return n._unary(math.log(n.value), 1 / n.value)
+
+    @staticmethod
+    def abs(n: 'TapeVariable'):
+        return n._unary(math.fabs(n.value), _sign(n.value))
+
+    def __float__(self):
+        return float(self.value)
+
+    def __str__(self):
+        return f"TapeVariable({self.value} @ {self.index})"
+
+    def __repr__(self):
+        return f"TapeVariable(value={self.value}, index={self.index})"
+
+
+def reverse_gradient(fn: Callable, x) -> np.ndarray:
+    """
+    The gradient of a scalar function of n inputs, computed with one forward recording
+    and one backward sweep, so the cost does not grow with the number of inputs.
+    fn receives an object array of the inputs and should use DualNumber operations
+
+    :param fn: Function of the form (inputs) -> number
+    :param x: (n,) point
+    :return: (n,) gradient
+    """
+    tape = Tape()
+    variables = tape.variables(x)
+    return tape.gradient(fn(variables), variables)
+
+
+class TaylorNumber:
+    """
+    A truncated Taylor polynomial c_0 + c_1 h + ... + c_n h^n, where c_k = f^(k)(x) / k!.
+
+    Evaluating a function written with DualNumber operations on TaylorNumber.variable(x, n)
+    propagates every derivative up to order n exactly in one evaluation.
+    The coefficients may be arrays, with axis 0 being the order
+    """
+    __slots__ = ("coefficients",)
+
+    # make numpy arrays defer to our reflected operators
+    __array_ufunc__ = None
+
+    def __init__(self, coefficients):
+        self.coefficients = np.asarray(coefficients, dtype=np.float64)
+
+    @staticmethod
+    def variable(x, order: int) -> 'TaylorNumber':
+        """
+        The independent variable expanded around x
+
+        :param x: The expansion point, may be an array
+        :param order: The highest derivative to track
+        :return: x + h
+        """
+        x = np.asarray(x, dtype=np.float64)
+        coefficients = np.zeros((order + 1,) + x.shape)
+        coefficients[0] = x
+        if order > 0:
+            coefficients[1] = 1
+        return TaylorNumber(coefficients)
+
+    def order(self) -> int:
+        return len(self.coefficients) - 1
+
+    def derivatives(self) -> np.ndarray:
+        """
+        :return: f(x), f'(x), ..., f^(n)(x)
+        """
+        factorials = np.cumprod([1.0] + list(range(1, self.order() + 1)))
+        return self.coefficients * factorials.reshape((-1,) + (1,) * (self.coefficients.ndim - 1))
+
+    def _constant(self, value) -> 'TaylorNumber':
+        coefficients = np.zeros_like(self.coefficients)
+        coefficients[0] = value
+        return TaylorNumber(coefficients)
+
+    def _coerce(self, other: Any) -> 'TaylorNumber':
+        if isinstance(other, TaylorNumber):
+            if other.order() != self.order():
+                raise ValueError("cannot combine taylor numbers of different orders")
+            return other
+        if isinstance(other, (DualNumber, TapeVariable)):
+            raise TypeError("cannot mix a TaylorNumber with other autodiff numbers")
+        return self._constant(other)
+
+    def __add__(self, other: Any):
+        return TaylorNumber(self.coefficients + self._coerce(other).coefficients)
+
+    def __sub__(self, other: Any):
+        return TaylorNumber(self.coefficients - self._coerce(other).coefficients)
+
+    def __mul__(self, other: Any):
+        if not isinstance(other, TaylorNumber) and not isinstance(other, (DualNumber, TapeVariable)):
+            return TaylorNumber(self.coefficients * other)
+
+        a = self.coefficients
+        b = self._coerce(other).coefficients
+        c = np.zeros_like(a)
+        for k in range(len(a)):
+            c[k] = np.sum(a[:k + 1] * b[k::-1], axis=0)
+        return TaylorNumber(c)
+
+    def __truediv__(self, other: Any):
+        a = self.coefficients
+        b = self._coerce(other).coefficients
+        c = np.zeros_like(a)
+        for k in range(len(a)):
+            c[k] = (a[k] - np.sum(b[1:k + 1] * c[k - 1::-1][:k], axis=0)) / b[0]
+        return TaylorNumber(c)
+
+    def __radd__(self, other: Any):
+        return self + other
+
+    def __rsub__(self, other: Any):
+        return -self + other
+
+    def __rmul__(self, other: Any):
+        return self * other
+
+    def __rtruediv__(self, other: Any):
+        return self._coerce(other) / self
+
+    def __neg__(self):
+        return TaylorNumber(-self.coefficients)
+
+    def _weighted(self, k: int) -> np.ndarray:
+        # j * a_j for j = 1..k
+        a = self.coefficients
+        return a[1:k + 1] * np.arange(1, k + 1).reshape((-1,) + (1,) * (a.ndim - 1))
+
+    def __pow__(self, r):
+        if isinstance(r, (TaylorNumber, DualNumber, TapeVariable)):
+            raise TypeError("can only raise a TaylorNumber to a constant power")
+
+        if float(r).is_integer() and r >= 0:
+            # repeated squaring, the recurrence below divides by a_0 which is often 0 for polynomials
+            result = self._constant(1)
+            base = self
+            n = int(r)
+            while n > 0:
+                if n & 1:
+                    result = result * base
+                base = base * base
+                n >>= 1
+            return result
+
+        a = self.coefficients
+        p = np.zeros_like(a)
+        p[0] = np.power(a[0], r)
+        for k in range(1, len(a)):
+            j = np.arange(1, k + 1).reshape((-1,) + (1,) * (a.ndim - 1))
+            p[k] = np.sum(((r + 1) * j - k) * a[1:k + 1] * p[k - 1::-1][:k], axis=0) / (k * a[0])
+        return TaylorNumber(p)
+
+    @staticmethod
+    def sin(n: 'TaylorNumber'):
+        return TaylorNumber._sin_cos(n)[0]
+
+    @staticmethod
+    def cos(n: 'TaylorNumber'):
+        return TaylorNumber._sin_cos(n)[1]
+
+    @staticmethod
+    def _sin_cos(n: 'TaylorNumber'):
+        a = n.coefficients
+        s = np.zeros_like(a)
+        c = np.zeros_like(a)
+        s[0] = np.sin(a[0])
+        c[0] = np.cos(a[0])
+        for k in range(1, len(a)):
+            weighted = n._weighted(k)
+            s[k] = np.sum(weighted * c[k - 1::-1][:k], axis=0) / k
+            c[k] = -np.sum(weighted * s[k - 1::-1][:k], axis=0) / k
+        return TaylorNumber(s), TaylorNumber(c)
+
+    @staticmethod
+    def exp(n: 'TaylorNumber'):
+        a = n.coefficients
+        e = np.zeros_like(a)
+        e[0] = np.exp(a[0])
+        for k in range(1, len(a)):
+            e[k] = np.sum(n._weighted(k) * e[k - 1::-1][:k], axis=0) / k
+        return TaylorNumber(e)
+
+    @staticmethod
+    def ln(n: 'TaylorNumber'):
+        a = n.coefficients
+        l = np.zeros_like(a)
+        l[0] = np.log(a[0])
+        for k in range(1, len(a)):
+            # sum of j * l_j * a_(k-j) for j = 1..k-1
+            weighted = l[1:k] * np.arange(1, k).reshape((-1,) + (1,) * (a.ndim - 1))
+            l[k] = (a[k] - np.sum(weighted * a[k - 1:0:-1], axis=0) / k) / a[0]
+        return TaylorNumber(l)
+
+    @staticmethod
+    def abs(n: 'TaylorNumber'):
+        return TaylorNumber(n.coefficients * _sign_array(n.coefficients[0]))
+
+    @staticmethod
+    def expand(fn: Callable, x, order: int) -> np.ndarray:
+        """
+        Evaluates f(x), f'(x), ..., f^(n)(x) of a function written with DualNumber operations
+
+        :param fn: The function
+        :param x: The point, may be an array
+        :param order: The highest derivative
+        :return: (order + 1, ...) array of the derivatives
+        """
+        result = fn(TaylorNumber.variable(x, order))
+        if not isinstance(result, TaylorNumber):
+            # the function is constant
+            result = TaylorNumber.variable(x, order)._constant(result)
+        return result.derivatives()
+
+    def __str__(self):
+        return " + ".join(f"{c}h^{k}" for k, c in enumerate(self.coefficients))
+
+    def __repr__(self):
+        return f"TaylorNumber(coefficients={self.coefficients!r})"
+
+
 Dual = DualNumber
 
 
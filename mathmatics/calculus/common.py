@@ -1,4 +1,6 @@
-from typing import Callable
+from typing import Any, Callable, Sequence, Tuple
+
+import numpy as np
 
 
 def sigma(fn: Callable, n: int, to: int) -> float:
@@ -14,3 +16,76 @@ def sigma(fn: Callable, n: int, to: int) -> float:
     for x in range(n, to+1):
         result += fn(x)
     return result
+
+
+def evaluate(fn: Callable, xs) -> np.ndarray:
+    """
+    Evaluates fn at every point of xs, in one call with the whole array when fn accepts arrays,
+    otherwise falling back to one call per element
+
+    :param fn: Function of one variable
+    :param xs: Array of points
+    :return: Array of fn(x), the same shape as xs
+    """
+    xs = np.asarray(xs, dtype=np.float64)
+    try:
+        ys = np.asarray(fn(xs))
+        if ys.shape == xs.shape:
+            return ys
+    except (TypeError, ValueError):
+        # scalar only functions, e.g. math.sin or branching on the value of x
+        pass
+    return np.asarray([fn(x) for x in xs.ravel()]).reshape(xs.shape)
+
+
+def evaluate_points(fn: Callable, points) -> np.ndarray:
+    """
+    Evaluates fn(*coordinates) at every row of an (n, d) array of points, in one call with the coordinate arrays
+    when fn accepts arrays, otherwise falling back to one call per point
+
+    :param fn: Function of d variables
+    :param points: (n, d) array of points
+    :return: (n,) array of fn at each point
+    """
+    points = np.asarray(points, dtype=np.float64)
+    try:
+        ys = np.asarray(fn(*points.T))
+        if ys.shape == points.shape[:1]:
+            return ys
+    except (TypeError, ValueError):
+        pass
+    return np.asarray([fn(*point) for point in points])
+
+
+def sample_statistics(values, axis: int = 0) -> Tuple[int, Any, Any]:
+    """
+    The (count, mean, sum of squared deviations) of samples, the partial statistics combine_statistics merges
+
+    :param values: Array of samples
+    :param axis: Axis of values the samples are on
+    :return: (count, mean, sum of squared deviations)
+    """
+    values = np.asarray(values, dtype=np.float64)
+    mean = np.mean(values, axis=axis)
+    return values.shape[axis], mean, np.sum(np.square(values - np.expand_dims(mean, axis)), axis=axis)
+
+
+def combine_statistics(parts: Sequence[Tuple[int, Any, Any]]) -> Tuple[int, Any, Any]:
+    """
+    Merges the (count, mean, sum of squared deviations) of separate batches of samples,
+    with the pairwise update of Chan et al. so no samples have to be kept
+    https://en.wikipedia.org/wiki/Algorithms_for_calculating_variance#Parallel_algorithm
+
+    :param parts: Statistics of each batch, as returned by sample_statistics
+    :return: (count, mean, sum of squared deviations) of all the samples
+    """
+    count, mean, m2 = 0, 0.0, 0.0
+    for n, part_mean, part_m2 in parts:
+        if n == 0:
+            continue
+        delta = part_mean - mean
+        total = count + n
+        mean = mean + delta * n / total
+        m2 = m2 + part_m2 + delta ** 2 * count * n / total
+        count = total
+    return count, mean, m2
@@ -1,5 +1,10 @@
-from typing import Callable
+from functools import lru_cache
+from typing import Callable, List, Sequence, Tuple
 
+import numpy as np
+
+from mathmatics.calculus.autodif import TaylorNumber
+from mathmatics.calculus.common import evaluate
 from mathmatics.exceptions.common import DerivativeNegativeDegree
 
 
@@ -18,7 +23,7 @@ def derivative(fn: Callable, x: float, dx: float = 0.01) -> float:
 
 def derivative_fn(fn: Callable, degree: int = 1, dx: float = 0.01) -> Callable:
     """
-    Returns the limit definition of derivative as a function
+    Returns the derivative as a function, using one central difference stencil of the given degree
 
     :param fn: Function to take the derivative of
     :param degree: Degree of derivative
@@ -31,20 +36,255 @@ def derivative_fn(fn: Callable, degree: int = 1, dx: float = 0.01) -> Callable:
     if degree == 0:
         return fn
 
-    # function creator because scoping issues
-    # https://stackoverflow.com/questions/233673/how-do-lexical-closures-work
-    def fnC(fn: Callable):
-        def func(x): return derivative(fn, x, dx)
-
-        return func
+    def der(x):
+        return stencil_derivative(fn, x, degree, dx=dx)
 
-    der = fnC(fn)
-    for _ in range(1, degree):
-        tmp = der
-        der = fnC(tmp)
     return der
 
 
+def stencil_coefficients(offsets: Sequence[float], degree: int) -> np.ndarray:
+    """
+    The finite difference weights of the *degree*th derivative on a stencil,
+    f^(degree)(x) ~ sum(w_i f(x + offsets_i h)) / h^degree\n
+    Fornberg, Generation of Finite Difference Formulas on Arbitrarily Spaced Grids (1988)
+
+    :param offsets: Positions of the stencil points in units of h
+    :param degree: Degree of derivative, below the number of points
+    :return: The weights of each point
+    """
+    if degree < 0:
+        raise DerivativeNegativeDegree
+    if degree >= len(offsets):
+        raise ValueError(f"a stencil of {len(offsets)} points cannot give derivative of degree {degree}")
+
+    x = np.asarray(offsets, dtype=np.float64)
+    c = np.zeros((len(x), degree + 1))
+    c[0, 0] = 1
+    c1 = 1.0
+    c4 = x[0]
+    for i in range(1, len(x)):
+        top = min(i, degree)
+        c2 = 1.0
+        c5 = c4
+        c4 = x[i]
+        for j in range(i):
+            c3 = x[i] - x[j]
+            c2 *= c3
+            if j == i - 1:
+                for k in range(top, 0, -1):
+                    c[i, k] = c1 * (k * c[i - 1, k - 1] - c5 * c[i - 1, k]) / c2
+                c[i, 0] = -c1 * c5 * c[i - 1, 0] / c2
+            for k in range(top, 0, -1):
+                c[j, k] = (c4 * c[j, k] - k * c[j, k - 1]) / c3
+            c[j, 0] = c4 * c[j, 0] / c3
+        c1 = c2
+    return c[:, degree]
+
+
+@lru_cache(maxsize=None)
+def central_stencil(degree: int, accuracy: int = 2) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    The central difference stencil of the *degree*th derivative with error O(h^accuracy)
+
+    :param degree: Degree of derivative
+    :param accuracy: Order of accuracy, a positive even number
+    :return: (offsets, weights)
+    """
+    if accuracy < 2 or accuracy % 2 != 0:
+        raise ValueError("central stencils have an even order of accuracy")
+    reach = (degree + 1) // 2 - 1 + accuracy // 2
+    offsets = np.arange(-reach, reach + 1, dtype=np.float64)
+    weights = stencil_coefficients(offsets, degree)
+    # the arrays are cached and shared between callers
+    offsets.setflags(write=False)
+    weights.setflags(write=False)
+    return offsets, weights
+
+
+def stencil_derivative(fn: Callable, x, degree: int = 1, accuracy: int = 2, dx: float = 0.01):
+    """
+    The central difference derivative, every stencil point is evaluated in one call when fn accepts arrays
+
+    :param fn: Function to take the derivative of
+    :param x: X, or an array of x
+    :param degree: Degree of derivative
+    :param accuracy: Order of accuracy of the stencil
+    :param dx: H
+    :return: The derivative at x
+    """
+    offsets, weights = central_stencil(degree, accuracy)
+    xs = np.asarray(x, dtype=np.float64)
+    ys = evaluate(fn, xs[..., np.newaxis] + offsets * dx)
+    result = ys @ weights / dx ** degree
+    # a single x gives a numpy scalar, or the number type fn returns such as a DualNumber, which is kept as is
+    if isinstance(result, (np.ndarray, np.generic)) and result.ndim == 0:
+        return result.item()
+    return result
+
+
+def richardson_derivative(fn: Callable, x: float, degree: int = 1, accuracy: int = 2, dx: float = None,
+                          levels: int = 10) -> Tuple[float, float]:
+    """
+    The central difference derivative with Richardson extrapolation over halving steps,
+    the estimate with the smallest error is chosen so the step does not have to be tuned (Ridders' method).
+    The stencils of every step are evaluated in one call when fn accepts arrays
+
+    :param fn: Function to take the derivative of
+    :param x: X
+    :param degree: Degree of derivative
+    :param accuracy: Order of accuracy of the stencil
+    :param dx: The largest step, defaults to 0.1 max(1, |x|)
+    :param levels: Number of steps, each half the last
+    :return: (derivative, error estimate)
+    """
+    offsets, weights = central_stencil(degree, accuracy)
+    if dx is None:
+        dx = 0.1 * max(1.0, abs(x))
+    steps = dx / 2.0 ** np.arange(levels)
+    estimates = evaluate(fn, x + steps[:, np.newaxis] * offsets) @ weights / steps ** degree
+
+    # the central stencil's error has only even powers of h after the leading h^accuracy
+    table = np.zeros((levels, levels))
+    table[:, 0] = estimates
+    best, error = float(estimates[0]), np.inf
+    for i in range(1, levels):
+        for j in range(1, i + 1):
+            factor = 2.0 ** (accuracy + 2 * (j - 1))
+            table[i, j] = table[i, j - 1] + (table[i, j - 1] - table[i - 1, j - 1]) / (factor - 1)
+            estimate = max(abs(table[i, j] - table[i, j - 1]), abs(table[i, j] - table[i - 1, j - 1]))
+            if estimate <= error:
+                best, error = float(table[i, j]), estimate
+        # stop once rounding makes the higher order estimates worse
+        if abs(table[i, i] - table[i - 1, i - 1]) >= 2 * error:
+            break
+    return best, float(error)
+
+
+def _correlate(ys: np.ndarray, offsets: np.ndarray, weights: np.ndarray, size: int) -> np.ndarray:
+    """
+    Applies a stencil along the last axis at the *size* points starting -offsets[0] points in
+    """
+    start = -int(offsets[0])
+    result = np.zeros(ys.shape[:-1] + (size,), dtype=np.result_type(ys, weights))
+    for offset, weight in zip(offsets.astype(int), weights):
+        if weight != 0:
+            result += weight * ys[..., start + offset:start + offset + size]
+    return result
+
+
+def grid_derivative(ys, dx=1.0, degree: int = 1, accuracy: int = 2, axis: int = -1) -> np.ndarray:
+    """
+    Derivatives at every point of uniformly sampled data, central differences inside
+    and one sided stencils of the same accuracy at the boundaries (like numpy.gradient with edge_order=2)
+
+    :param ys: The samples
+    :param dx: The sample spacing, or an array of the sample positions for uneven first derivatives
+    :param degree: Degree of derivative
+    :param accuracy: Order of accuracy, a positive even number
+    :param axis: Axis of ys to differentiate along
+    :return: The derivative at every sample
+    """
+    ys = np.asarray(ys)
+    if np.ndim(dx) > 0:
+        if degree != 1 or accuracy != 2:
+            raise ValueError("uneven samples only support first derivatives of accuracy 2")
+        return np.gradient(ys, np.asarray(dx, dtype=np.float64), axis=axis, edge_order=2)
+
+    ys = np.moveaxis(ys, axis, -1)
+    n = ys.shape[-1]
+    points = degree + accuracy
+    if n < points:
+        raise ValueError(f"need at least {points} samples for derivative {degree} of accuracy {accuracy}")
+
+    offsets, weights = central_stencil(degree, accuracy)
+    reach = int(offsets[-1])
+    result = np.empty(ys.shape, dtype=np.result_type(ys, weights))
+    if n > 2 * reach:
+        result[..., reach:n - reach] = _correlate(ys, offsets, weights, n - 2 * reach)
+
+    # one sided stencils at the ends
+    for i in range(min(reach, n)):
+        left = stencil_coefficients(np.arange(points) - i, degree)
+        result[..., i] = ys[..., :points] @ left
+        right = stencil_coefficients(np.arange(points) - (points - 1 - i), degree)
+        result[..., n - 1 - i] = ys[..., n - points:] @ right
+
+    return np.moveaxis(result / dx ** degree, -1, axis)
+
+
+def grid_derivative_fn(fn: Callable, xs, degree: int = 1, accuracy: int = 2) -> np.ndarray:
+    """
+    Derivatives of fn at every point of a uniform grid, fn is evaluated once over the grid only,
+    with one sided stencils at the ends as in grid_derivative
+
+    :param fn: Function to take the derivative of
+    :param xs: Evenly spaced points
+    :param degree: Degree of derivative
+    :param accuracy: Order of accuracy, a positive even number
+    :return: The derivative at each x
+    """
+    xs = np.asarray(xs, dtype=np.float64)
+    if len(xs) < 2:
+        raise ValueError("need at least two points to find the grid spacing")
+    dx = xs[1] - xs[0]
+    if not np.allclose(np.diff(xs), dx):
+        raise ValueError("the points must be evenly spaced")
+
+    return grid_derivative(evaluate(fn, xs), dx, degree, accuracy)
+
+
+def spectral_derivative(ys, dx: float = 1.0, degree: int = 1, axis: int = -1) -> np.ndarray:
+    """
+    Derivatives of periodic samples by multiplying their discrete fourier transform by (ik)^degree,
+    exact up to rounding for band limited data\n
+    https://en.wikipedia.org/wiki/Spectral_method
+
+    :param ys: Samples over one period, the period being len(ys) * dx
+    :param dx: The sample spacing
+    :param degree: Degree of derivative
+    :param axis: Axis of ys to differentiate along
+    :return: The derivative at every sample
+    """
+    if degree < 0:
+        raise DerivativeNegativeDegree
+
+    ys = np.moveaxis(np.asarray(ys), axis, -1)
+    n = ys.shape[-1]
+    if np.iscomplexobj(ys):
+        k = 2 * np.pi * np.fft.fftfreq(n, dx)
+        result = np.fft.ifft((1j * k) ** degree * np.fft.fft(ys), n)
+    else:
+        k = 2 * np.pi * np.fft.rfftfreq(n, dx)
+        factor = (1j * k) ** degree
+        if n % 2 == 0 and degree % 2 == 1:
+            # the nyquist mode has no well defined odd derivative
+            factor[-1] = 0
+        result = np.fft.irfft(factor * np.fft.rfft(ys), n)
+    return np.moveaxis(result, -1, axis)
+
+
+def derivatives(fn: Callable, x: float, degree: int, dx: float = 0.01) -> List[float]:
+    """
+    Returns fn(x) and its derivatives at x up to *degree*.
+    When fn is written with DualNumber operations every derivative is found exactly in one evaluation
+    using Taylor arithmetic, otherwise this falls back to a central difference stencil for each degree
+
+    :param fn: Function to take the derivatives of
+    :param x: X
+    :param degree: Highest degree of derivative
+    :param dx: H, for the finite difference fallback
+    :return: [fn(x), fn'(x), ..., fn^(degree)(x)]
+    """
+    if degree < 0:
+        raise DerivativeNegativeDegree
+
+    try:
+        return [float(d) for d in TaylorNumber.expand(fn, x, degree)]
+    except TypeError:
+        # fn uses operations a TaylorNumber does not support, such as math.* functions
+        return [derivative_fn(fn, n, dx)(x) for n in range(degree + 1)]
+
+
 def inverse_function(func: Callable, a: float, b: float, c: float = None, dx=0.01):
     """
     Return the inverse function of *func*, with region from a to b,
@@ -62,11 +302,9 @@ def inverse_function(func: Callable, a: float, b: float, c: float = None, dx=0.0
     if c is None:
         c = (a + b) / 2
 
+    fc, df, ddf, dddf = derivatives(func, c, 3, dx)
+
     def inverse(y):
-        fc = func(c)
-        df = derivative_fn(func, 1, dx)(c)
-        ddf = derivative_fn(func, 2, dx)(c)
-        dddf = derivative_fn(func, 3, dx)(c)
         return c + 1 / df * (y - fc) - ddf / (2 * df ** 3) * (y - fc) ** 2 + (3 * ddf ** 2 - dddf * df) / (
                     6 * df ** 5) * (y - fc) ** 3
 
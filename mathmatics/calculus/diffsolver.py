@@ -1,18 +1,255 @@
 import math
 from abc import ABC, abstractmethod
-import random
-from typing import Callable, Tuple
+from multiprocessing import Pool
+from typing import Callable, Tuple, Union, Optional, Iterator, Any
 
 import numpy as np
+from scipy.linalg import lu_factor, lu_solve
+from scipy.optimize import brentq
 
+from mathmatics.calculus.autodif import DualNumber, jacobian as dual_jacobian
+from mathmatics.calculus.common import sample_statistics, combine_statistics
 from mathmatics.structures.matrix import Matrix
 
 
+class Trajectory:
+    """
+    The solution of a differential equation, written into preallocated numpy arrays:
+    a (n,) vector of times and an (n, *state shape) array of states, which grow by doubling when full.
+
+    Only every *save_every* step is stored, the first and last steps are always kept.
+    Indexing and iterating give (t, y) pairs
+    """
+
+    def __init__(self, e0, save_every: Optional[int] = 1, capacity: int = 1024, transpose: bool = False):
+        """
+        :param e0: The initial state, only used for its shape
+        :param save_every: Store every nth step, None stores only the first and last steps
+        :param capacity: Number of steps to allocate room for up front
+        :param transpose: Store the transpose of every state, ensembles are stepped as (dim, M) but kept as (M, dim)
+        """
+        self._transpose = transpose
+        self._shape = np.shape(e0)[::-1] if transpose else np.shape(e0)
+        self._ts = np.empty(capacity)
+        self._ys = np.empty((capacity,) + self._shape)
+        self._size = 0
+
+        self.save_every = math.inf if save_every is None else save_every
+        self._skipped = 0
+        self._pending = None
+
+        # the times and states of every event occurrence, one array per event function
+        self.t_events = None
+        self.y_events = None
+
+    def _store(self, t: float, y):
+        if self._size == len(self._ts):
+            capacity = 2 * len(self._ts)
+            ts = np.empty(capacity)
+            ys = np.empty((capacity,) + self._shape)
+            ts[:self._size] = self._ts
+            ys[:self._size] = self._ys
+            self._ts, self._ys = ts, ys
+
+        self._ts[self._size] = t
+        self._ys[self._size] = np.transpose(y) if self._transpose else y
+        self._size += 1
+
+    def append(self, t: float, y):
+        if self._size == 0 or self._skipped + 1 >= self.save_every:
+            self._store(t, y)
+            self._skipped = 0
+            self._pending = None
+        else:
+            self._skipped += 1
+            # kept so the last step can be stored by finish, solvers never modify a state in place
+            self._pending = (t, y)
+
+    def finish(self) -> 'Trajectory':
+        """
+        Stores the last step if it was skipped by *save_every*
+        """
+        if self._pending is not None:
+            self._store(*self._pending)
+            self._pending = None
+        return self
+
+    @property
+    def ts(self) -> np.ndarray:
+        return self._ts[:self._size]
+
+    @property
+    def ys(self) -> np.ndarray:
+        return self._ys[:self._size]
+
+    def __len__(self):
+        return self._size
+
+    def __getitem__(self, location):
+        if isinstance(location, slice):
+            return [self[i] for i in range(*location.indices(self._size))]
+
+        if location < 0:
+            location += self._size
+        if not 0 <= location < self._size:
+            raise IndexError("trajectory index out of range")
+        return float(self._ts[location]), self._ys[location][()]
+
+    def __iter__(self):
+        for i in range(self._size):
+            yield self[i]
+
+
+class Event:
+    """
+    A function g(t, q) whose zeros are located while integrating, any callable can be used as an event
+    and given terminal and direction attributes instead
+    """
+
+    def __init__(self, fn: Callable, terminal: bool = False, direction: int = 0):
+        """
+        :param fn: The event function (t, q) -> num, an event occurs where it crosses zero
+        :param terminal: Stop the integration at the first occurrence
+        :param direction: 1 to only count rising crossings, -1 for falling crossings and 0 for both
+        """
+        self.fn = fn
+        self.terminal = terminal
+        self.direction = direction
+
+    def __call__(self, t: float, q):
+        return self.fn(t, q)
+
+
+def _hermite(t0: float, y0, f0, t1: float, y1, f1) -> Callable:
+    """
+    The cubic hermite interpolant of a step from its end points and their derivatives
+    """
+    h = t1 - t0
+
+    def interpolant(t):
+        s = (t - t0) / h
+        return ((1 + 2 * s) * (1 - s) ** 2 * y0 + s * (1 - s) ** 2 * h * f0
+                + s ** 2 * (3 - 2 * s) * y1 + s ** 2 * (s - 1) * h * f1)
+
+    return interpolant
+
+
+def _crossing(event: Callable, interpolant: Callable, t0: float, t1: float, g0: float, g1: float) -> Optional[float]:
+    """
+    Finds the time the event crosses zero within a step, None if it does not cross in the wanted direction
+    """
+    direction = getattr(event, 'direction', 0)
+    rising = g0 < 0 <= g1
+    falling = g0 > 0 >= g1
+    if not ((rising and direction >= 0) or (falling and direction <= 0)):
+        return None
+    if g1 == 0:
+        return t1
+
+    def g(t):
+        return event(t, interpolant(t))
+
+    # the interpolant may not reproduce the end points exactly
+    if g(t0) * g(t1) > 0:
+        return t1
+    return brentq(g, min(t0, t1), max(t0, t1))
+
+
+class _FirstOrder:
+    """
+    The first order system of a higher order equation on the state [y, y', ..., y^(n-1)],
+    a class rather than a closure so it can be sent to other processes
+    """
+
+    def __init__(self, equation: Callable):
+        self.equation = equation
+
+    def __call__(self, t, q):
+        if isinstance(q, np.ndarray) and q.ndim > 0:
+            dq = self.equation(t, q)
+            if np.ndim(dq) == q.ndim - 1:
+                return np.asarray([*q[1:], dq])
+            # evaluated at an array of times, the derivatives gain a trailing axis
+            return np.stack(np.broadcast_arrays(*q[1:], dq))
+        return self.equation(t, q)
+
+
+class _TimeOnly:
+    def __init__(self, equation: Callable):
+        self.equation = equation
+
+    def __call__(self, t, q):
+        return self.equation(t)
+
+
 class DiffEqSolverBase(ABC):
     @abstractmethod
-    def _solve(self, equation: Callable, e0, t0: float, tf: float):
+    def _steps(self, equation: Callable, e0, t0: float, tf: float) -> Iterator[Tuple[float, Any]]:
+        """
+        Generates (t, y) for the initial conditions and then every step, as they are computed
+        """
         pass
 
+    def _solve(self, equation: Callable, e0, t0: float, tf: float, out: Trajectory) -> Trajectory:
+        for t, y in self._steps(equation, e0, t0, tf):
+            out.append(t, y)
+        return out
+
+    def _interpolated_steps(self, equation: Callable, e0, t0: float, tf: float):
+        """
+        Generates (t, y, interpolant) for every step, where interpolant(s) is the state at a time s within the step.
+        Cubic hermite interpolation is used unless the solver has its own continuous extension
+        """
+        steps = self._steps(equation, e0, t0, tf)
+        try:
+            t_prev, y_prev = next(steps)
+            f_prev = np.asarray(equation(t_prev, y_prev), dtype=np.float64)
+            for t, y in steps:
+                f = np.asarray(equation(t, y), dtype=np.float64)
+                yield t, y, _hermite(t_prev, y_prev, f_prev, t, y, f)
+                t_prev, y_prev, f_prev = t, y, f
+        finally:
+            steps.close()
+
+    def _solve_events(self, equation: Callable, e0, t0: float, tf: float, out: Trajectory, events) -> Trajectory:
+        t_events = [[] for _ in events]
+        y_events = [[] for _ in events]
+        values = [event(t0, e0) for event in events]
+        t_prev = t0
+        out.append(t0, e0)
+
+        steps = self._interpolated_steps(equation, e0, t0, tf)
+        try:
+            for t, y, interpolant in steps:
+                new_values = [event(t, y) for event in events]
+                crossings = []
+                for i, event in enumerate(events):
+                    root = _crossing(event, interpolant, t_prev, t, values[i], new_values[i])
+                    if root is not None:
+                        crossings.append((root, i))
+                crossings.sort(key=lambda crossing: (crossing[0] - t_prev) / (t - t_prev))
+
+                terminated = False
+                for root, i in crossings:
+                    state = interpolant(root)
+                    t_events[i].append(root)
+                    y_events[i].append(state)
+                    if getattr(events[i], 'terminal', False):
+                        out.append(root, state)
+                        terminated = True
+                        break
+                if terminated:
+                    break
+
+                out.append(t, y)
+                values, t_prev = new_values, t
+        finally:
+            steps.close()
+
+        out.t_events = [np.asarray(ts, dtype=np.float64) for ts in t_events]
+        out.y_events = [np.asarray(ys, dtype=np.float64) for ys in y_events]
+        return out
+
     def integrate(self, equation: Callable, a: float, b: float):
         """
         Integrate a y-independent equation from t=a to t=b
@@ -28,14 +265,26 @@ class DiffEqSolverBase(ABC):
             sign = -1
             a, b = b, a
 
-        def dydt(t, q):
-            return equation(t)
-
+        dydt = _TimeOnly(equation)
         e = equation(a)
-        out = self._solve(dydt, e, a, b)
+        # only the end points are needed
+        out = self._solve(dydt, e, a, b, Trajectory(e, save_every=None)).finish()
         return (out[-1][1] - out[0][1]) * sign
 
-    def solve(self, equation: Callable, e0, t0: float, tf: float):
+    @staticmethod
+    def _reduce(equation: Callable, e0):
+        """
+        Reduces a higher order equation q^(n) = f(t, q) to a first order system on the state [y, y', ..., y^(n-1)]
+        """
+        if isinstance(e0, list):
+            initial = np.asarray(e0, dtype='float64')
+        else:
+            initial = e0
+
+        return _FirstOrder(equation), initial
+
+    def solve(self, equation: Callable, e0, t0: float, tf: float, save_every: Optional[int] = 1,
+              events=None) -> Trajectory:
         """
         Solve a differential equation *equation* with initial conditions *e0*, from t0 to tf
 
@@ -43,19 +292,118 @@ class DiffEqSolverBase(ABC):
         :param e0: The initial conditions, could be a list
         :param t0: THe initial time
         :param tf: The final time
-        :return: A list of (time, q) pairs
+        :param save_every: Only store every nth step, None to only store the first and last steps
+        :param events: Event functions (t, q) -> num, see Event. Their zero crossings are located on each step's
+                       interpolant and stored in the trajectory's t_events and y_events
+        :return: The trajectory of (time, q) pairs
         """
-        if isinstance(e0, list):
-            initial = np.asarray(e0, dtype='float64')
-        else:
-            initial = e0
+        dzdt, initial = self._reduce(equation, e0)
+        out = Trajectory(initial, save_every=save_every)
+        if events is not None:
+            if callable(events):
+                events = [events]
+            return self._solve_events(dzdt, initial, t0, tf, out, events).finish()
+        return self._solve(dzdt, initial, t0, tf, out).finish()
+
+    def iter_solve(self, equation: Callable, e0, t0: float, tf: float, chunk_size: int = None,
+                   until: Callable = None) -> Iterator[Union[Tuple[float, Any], Trajectory]]:
+        """
+        Solve like *solve*, but generate the steps as they are computed instead of storing them all,
+        so long integrations can be plotted or reduced in constant memory
 
-        def dzdt(t, q):
-            if isinstance(q, np.ndarray):
-                return np.asarray([*q[1:], equation(t, q)])
-            return equation(t, q)
+        :param equation: The differential equation of form (t, q) -> num
+        :param e0: The initial conditions, could be a list
+        :param t0: The initial time
+        :param tf: The final time
+        :param chunk_size: Generate Trajectory chunks of up to this many steps, None generates single (t, q) pairs
+        :param until: A function (t, q) -> bool, the integration stops after the first step where it is true
+        :return: A generator of (time, q) pairs or Trajectory chunks
+        """
+        dzdt, initial = self._reduce(equation, e0)
+        steps = self._steps(dzdt, initial, t0, tf)
+        chunk = None
+        try:
+            for t, y in steps:
+                if chunk_size is None:
+                    yield t, y
+                else:
+                    if chunk is None:
+                        chunk = Trajectory(initial, capacity=chunk_size)
+                    chunk.append(t, y)
+                    if len(chunk) == chunk_size:
+                        yield chunk
+                        chunk = None
+
+                if until is not None and until(t, y):
+                    break
+
+            if chunk is not None:
+                yield chunk
+        finally:
+            steps.close()
+
+    @staticmethod
+    def _ensemble(equation: Callable, e0s, params=None):
+        """
+        Reduces an equation over an ensemble of M trajectories to a first order system,
+        the state is stored as (dim, M) so every derivative q[i] is an (M,) array across the trajectories.
+
+        Returns (dzdt, initial), dzdt takes an optional third argument selecting the trajectories being evaluated
+        """
+        e0s = np.asarray(e0s, dtype=np.float64)
+        if params is not None:
+            # (p, M) so the equation can unpack the parameters like the state
+            params = np.asarray(params, dtype=np.float64)
+            if params.ndim == 1:
+                # one parameter per trajectory, still reached as p[0]
+                params = params[:, np.newaxis]
+            params = params.T
+            count = params.shape[-1]
+            if e0s.ndim == 0:
+                # a scalar initial condition shared by every parameter set, anything else needs one row per set
+                e0s = np.full(count, float(e0s))
+            if len(e0s) != count:
+                raise ValueError(f"{len(e0s)} initial conditions for {count} parameter sets")
+        if e0s.ndim == 0:
+            raise ValueError("an ensemble needs (M,) or (M, dim) initial conditions")
+        initial = np.array(e0s.T)
+
+        def dzdt(t, q, index=slice(None)):
+            if params is None:
+                dq = equation(t, q)
+            else:
+                dq = equation(t, q, params[..., index])
+            # one derivative per trajectory, broadcasting e.g. a single trajectory's value would go unnoticed
+            if np.shape(dq) != q.shape[-1:]:
+                raise ValueError(f"the equation returned shape {np.shape(dq)} for an ensemble of {q.shape[-1]}")
+            if q.ndim == 1:
+                return dq
+            return np.concatenate((q[1:], np.asarray(dq)[np.newaxis]))
+
+        return dzdt, initial
+
+    def solve_ensemble(self, equation: Callable, e0s, t0: float, tf: float, params=None,
+                       save_every: Optional[int] = 1) -> Trajectory:
+        """
+        Solve many initial conditions (or parameter sets) at once, all trajectories are stepped together.
 
-        return self._solve(dzdt, initial, t0, tf)
+        The equation is called with the state components as (M,) arrays, so it has to be vectorized
+        and return an (M,) array, e.g. lambda t, q: -q[0] for a second order equation.
+        For first order equations q is the (M,) array of states itself, e.g. lambda t, q: -q.
+        With *params* it is called as equation(t, q, p), p[i] being an (M,) array of the ith parameter
+
+        :param equation: The differential equation of form (t, q) -> num or (t, q, p) -> num
+        :param e0s: (M, dim) initial conditions, (M,) for first order equations,
+                    or with *params* a scalar initial condition shared by every parameter set
+        :param t0: The initial time
+        :param tf: The final time
+        :param params: (M, p) parameters of each trajectory, or (M,) for a single parameter p[0]
+        :param save_every: Only store every nth step, None to only store the first and last steps
+        :return: The trajectory, ys has shape (n, M, dim)
+        """
+        dzdt, initial = self._ensemble(equation, e0s, params)
+        out = Trajectory(initial, save_every=save_every, transpose=True)
+        return self._solve(dzdt, initial, t0, tf, out).finish()
 
 
 class EulersMethod(DiffEqSolverBase):
@@ -64,18 +412,15 @@ class EulersMethod(DiffEqSolverBase):
 
         self.step_size = step_size
 
-    def _solve(self, equation: Callable, e0, t0: float, tf: float):
-        out = []
+    def _steps(self, equation: Callable, e0, t0: float, tf: float) -> Iterator[Tuple[float, Any]]:
 
         y = e0
         t = t0
-        out.append((t, y))
+        yield t, y
         while t <= tf:
             y = y + self.step_size * equation(t, y)
             t = t + self.step_size
-            out.append((t, y))
-
-        return out
+            yield t, y
 
 
 class MidpointMethod(DiffEqSolverBase):
@@ -84,12 +429,11 @@ class MidpointMethod(DiffEqSolverBase):
 
         self.step_size = step_size
 
-    def _solve(self, equation: Callable, e0, t0: float, tf: float):
-        out = []
+    def _steps(self, equation: Callable, e0, t0: float, tf: float) -> Iterator[Tuple[float, Any]]:
 
         y = e0
         t = t0
-        out.append((t, y))
+        yield t, y
 
         while t <= tf:
             # estimate the y' at midpoint
@@ -100,9 +444,7 @@ class MidpointMethod(DiffEqSolverBase):
             y = y + h * equation(tm, dydtm)
             t = t + h
 
-            out.append((t, y))
-
-        return out
+            yield t, y
 
 
 class RK4Method(DiffEqSolverBase):
@@ -111,15 +453,14 @@ class RK4Method(DiffEqSolverBase):
 
         self.step_size = step_size
 
-    def _solve(self, equation: Callable, e0, t0: float, tf: float):
-        out = []
+    def _steps(self, equation: Callable, e0, t0: float, tf: float) -> Iterator[Tuple[float, Any]]:
 
         f = equation
         h = self.step_size
 
         y = e0
         t = t0
-        out.append((t, y))
+        yield t, y
 
         while t <= tf:
             k1 = f(t, y)
@@ -130,56 +471,94 @@ class RK4Method(DiffEqSolverBase):
             y = y + h / 6 * (k1 + 2 * k2 + 2 * k3 + k4)
             t = t + h
 
-            out.append((t, y))
-
-        return out
-
-
-def _summation(lst):
-    if len(lst) > 0 and isinstance(lst[0], (int, float)):
-        return sum(lst)
-
-    total = None
-    for l in lst:
-        if total is None:
-            total = l
-        else:
-            total += l
-    return 0 if total is None else total
+            yield t, y
+
+
+def _tableau(table, cs, bs) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Converts a butcher tableau to numpy arrays (A, c, b), A being the full square matrix.
+    The table can also be given without its zero first row, like the Matrix tableaus
+    """
+    cs = np.asarray(cs, dtype=np.float64)
+    bs = np.asarray(bs, dtype=np.float64)
+    stages = len(cs)
+    rows = table.data if isinstance(table, Matrix) else table
+
+    A = np.zeros((stages, stages))
+    if len(rows) == stages:
+        A[:] = rows
+    else:
+        for i in range(1, stages):
+            A[i, :i] = rows[i - 1][:i]
+    return A, cs, bs
+
+
+def _cooper_verner() -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    The 11 stage 8th order method of Cooper and Verner (1972)
+    """
+    r = math.sqrt(21)
+    cs = [0, 1 / 2, 1 / 2, (7 + r) / 14, (7 + r) / 14, 1 / 2, (7 - r) / 14, (7 - r) / 14, 1 / 2, (7 + r) / 14, 1]
+    table = [
+        [1 / 2],
+        [1 / 4, 1 / 4],
+        [1 / 7, (-7 - 3 * r) / 98, (21 + 5 * r) / 49],
+        [(11 + r) / 84, 0, (18 + 4 * r) / 63, (21 - r) / 252],
+        [(5 + r) / 48, 0, (9 + r) / 36, (-231 + 14 * r) / 360, (63 - 7 * r) / 80],
+        [(10 - r) / 42, 0, (-432 + 92 * r) / 315, (633 - 145 * r) / 90, (-504 + 115 * r) / 70, (63 - 13 * r) / 35],
+        [1 / 14, 0, 0, 0, (14 - 3 * r) / 126, (13 - 3 * r) / 63, 1 / 9],
+        [1 / 32, 0, 0, 0, (91 - 21 * r) / 576, 11 / 72, (-385 - 75 * r) / 1152, (63 + 13 * r) / 128],
+        [1 / 14, 0, 0, 0, 1 / 9, (-733 - 147 * r) / 2205, (515 + 111 * r) / 504, (-51 - 11 * r) / 56,
+         (132 + 28 * r) / 245],
+        [0, 0, 0, 0, (-42 + 7 * r) / 18, (-18 + 28 * r) / 45, (-273 - 53 * r) / 72, (301 + 53 * r) / 72,
+         (28 - 28 * r) / 45, (49 - 7 * r) / 18],
+    ]
+    bs = [1 / 20, 0, 0, 0, 0, 0, 0, 49 / 180, 16 / 45, 49 / 180, 1 / 20]
+    return _tableau(table, cs, bs)
 
 
 class RKMethod(DiffEqSolverBase):
+    """
+    An explicit Runge-Kutta method given by its butcher tableau (A, c, b).
+    Tableaus are stored as numpy arrays, every stage is one product of a row of A with the stacked stage derivatives
+    """
     METHODS = {
-        'rk4': (Matrix([
+        'rk4': _tableau([
             [0.5, 0, 0],
             [0, 0.5, 0],
             [0, 0, 1],
-        ]), [0, 0.5, 0.5, 1], [1 / 6, 1 / 3, 1 / 3, 1 / 6]),
-        '3/8': (
-            Matrix([
+        ], [0, 0.5, 0.5, 1], [1 / 6, 1 / 3, 1 / 3, 1 / 6]),
+        '3/8': _tableau(
+            [
                 [1 / 3, 0, 0],
                 [-1 / 3, 1, 0],
                 [1, -1, 1]
-            ]),
+            ],
             [0, 1 / 3, 2 / 3, 1],
             [1 / 8, 3 / 8, 3 / 8, 1 / 8]
         ),
-        'euler': (
-            Matrix([]),
+        'euler': _tableau(
+            [],
             [0],
             [1]
         ),
-        'midpoint': (
-            Matrix([
+        'midpoint': _tableau(
+            [
                 [1 / 2]
-            ]),
+            ],
             [0, 1 / 2],
             [0, 1]
-        )
+        ),
+        'rk8': _cooper_verner(),
     }
 
     def __init__(self, step_size: float = 0.01, tableu: Tuple[Matrix, Tuple[float], Tuple[float]] = None,
                  method: str = 'rk4'):
+        """
+        :param step_size: The fixed step size
+        :param tableu: (A, c, b), A can be a Matrix or nested lists without its zero first row, or a square array
+        :param method: Name of a tableau in METHODS, used when no tableu is given
+        """
         super()
 
         if tableu is None:
@@ -187,59 +566,801 @@ class RKMethod(DiffEqSolverBase):
             tableu = RKMethod.METHODS[method]
 
         self.step_size = step_size
-        self.tableu = tableu
+        self.tableu = _tableau(*tableu)
 
-    def _solve(self, equation: Callable, e0, t0: float, tf: float):
-        out = []
+    def _steps(self, equation: Callable, e0, t0: float, tf: float) -> Iterator[Tuple[float, Any]]:
 
         f = equation
         h = self.step_size
-        table, cs, bs = self.tableu
+        A, cs, bs = self.tableu
 
         y = e0
         t = t0
-        out.append((t, y))
+        yield t, y
 
         while t <= tf:
-            order = len(cs)
-            ks = [0] * order
-            for i in range(0, order):
-                # table[i-1] because implicit zero first row
-                ks[i] = f(t + h * cs[i], y + h * _summation([table[i - 1][j] * ks[j] for j in range(0, i)]))
+            ks = np.empty((len(cs),) + np.shape(y))
+            for i in range(len(cs)):
+                ks[i] = f(t + h * cs[i], y + h * np.tensordot(A[i, :i], ks[:i], axes=1))
 
-            y = y + h * _summation([bs[i] * ks[i] for i in range(0, order)])
+            y = y + h * np.tensordot(bs, ks, axes=1)
             t = t + h
 
-            out.append((t, y))
+            yield t, y
 
-        return out
+
+def _monte_carlo_sample(equation: Callable, t: float, dt: float, y, count: int, seed, vectorized: bool):
+    """
+    Evaluates the equation at *count* uniformly random times within the step,
+    returning the count, mean and sum of squared deviations of the samples
+    """
+    rng = np.random.default_rng(seed)
+    ts = t + dt * rng.random(count)
+    if vectorized:
+        # the samples are on the last axis
+        values = np.moveaxis(np.broadcast_to(equation(ts, y), np.shape(y) + (count,)), -1, 0)
+    else:
+        values = np.asarray([equation(s, y) for s in ts], dtype=np.float64)
+
+    return sample_statistics(values)
 
 
 class MonteCarloMethod(DiffEqSolverBase):
-    def __init__(self, step: float = 0.01, samples: int = 10000):
+    """
+    Steps by dt times the mean of the derivative at uniformly random times within each step.
+
+    The variance of every step's estimate is stored in *variances*, so the number of samples can be sized
+    """
+
+    def __init__(self, step: float = 0.01, samples: int = 10000, seed=None, vectorized: bool = False,
+                 processes: int = None):
+        """
+        :param step: The step size
+        :param samples: Number of samples per step
+        :param seed: Seed of the numpy random generator, None for a random seed
+        :param vectorized: The equation accepts an (n,) array of times,
+                           returning the samples on the last axis, e.g. (dim, n) for a higher order equation
+        :param processes: Split the samples between this many processes with independent random streams,
+                          the equation then has to be picklable (a module level function)
+        """
         self.samples = samples
         self.step = step
+        self.seed = seed
+        self.vectorized = vectorized
+        self.processes = processes
+
+        # the variance of the estimated change in y, per step of the last solve
+        self.variances = []
 
-    def _solve(self, equation: Callable, e0, t0: float, tf: float):
-        out = []
+    def _steps(self, equation: Callable, e0, t0: float, tf: float) -> Iterator[Tuple[float, Any]]:
 
         n = self.samples
         dt = self.step
+        seeds = np.random.SeedSequence(self.seed)
+        rng = np.random.default_rng(seeds)
+        self.variances = []
+
+        pool = Pool(self.processes) if self.processes is not None and self.processes > 1 else None
+        try:
+            y = e0
+            t = t0
+            yield t, y
+
+            while t <= tf:
+                if pool is None:
+                    parts = [_monte_carlo_sample(equation, t, dt, y, n, rng, self.vectorized)]
+                else:
+                    counts = np.diff(np.linspace(0, n, self.processes + 1).astype(int))
+                    parts = pool.starmap(_monte_carlo_sample, [
+                        (equation, t, dt, y, int(count), seed, self.vectorized)
+                        for count, seed in zip(counts, seeds.spawn(self.processes)) if count > 0
+                    ])
+
+                count, mean, m2 = combine_statistics(parts)
+                self.variances.append(dt ** 2 * m2 / max(count - 1, 1) / count)
+                y = y + dt * mean
+                t = t + dt
+                yield t, y
+        finally:
+            if pool is not None:
+                pool.terminate()
+
+
+class _SymplecticMethod(DiffEqSolverBase, ABC):
+    """
+    Symplectic integrators of separable second order equations x'' = a(t, x) on the state [x, x'],
+    the energy error stays bounded instead of drifting over long integrations.
+
+    The equation must not depend on the velocity, x can be a scalar or a vector (e0 of shape (2, d))
+    """
+
+    def __init__(self, step_size: float = 0.01):
+        """
+        :param step_size: The fixed step size
+        """
+        self.step_size = step_size
 
-        y = e0
+    @abstractmethod
+    def _advance(self, acceleration: Callable, t: float, x, v, a, h: float):
+        """
+        Takes one step of size h, given the acceleration *a* at the start of the step (None if unknown).
+        Returns the new position, velocity and acceleration (None if not evaluated at the new position)
+        """
+        pass
+
+    def _steps(self, equation: Callable, e0, t0: float, tf: float) -> Iterator[Tuple[float, Any]]:
+        state = np.asarray(e0, dtype=np.float64)
+        if state.ndim == 0 or len(state) != 2:
+            raise ValueError("symplectic methods need a second order equation with the state [x, x']")
+
+        def acceleration(t, x, v):
+            return np.asarray(equation(t, np.asarray([x, v])))[-1]
+
+        h = self.step_size
+        x, v = state
+        a = None
         t = t0
-        out.append((t, y))
+        yield t, e0
 
         while t <= tf:
-            dy = dt / n * _summation([equation(random.random() * dt + t, y) for _ in range(n)])
-            y = y + dy
-            t = t + dt
-            out.append((t, y))
+            x, v, a = self._advance(acceleration, t, x, v, a, h)
+            t = t + h
+            yield t, np.asarray([x, v])
+
+
+class VelocityVerletMethod(_SymplecticMethod):
+    """
+    Velocity verlet, kick-drift-kick with one evaluation per step, second order.
+    https://en.wikipedia.org/wiki/Verlet_integration#Velocity_Verlet
+    """
+
+    def _advance(self, acceleration: Callable, t: float, x, v, a, h: float):
+        if a is None:
+            a = acceleration(t, x, v)
+        v_half = v + h / 2 * a
+        x = x + h * v_half
+        a = acceleration(t + h, x, v_half)
+        return x, v_half + h / 2 * a, a
+
+
+class LeapfrogMethod(_SymplecticMethod):
+    """
+    Leapfrog in its drift-kick-drift form, the acceleration is evaluated once per step at the half step position.
+    https://en.wikipedia.org/wiki/Leapfrog_integration
+    """
+
+    def _advance(self, acceleration: Callable, t: float, x, v, a, h: float):
+        x_half = x + h / 2 * v
+        v = v + h * acceleration(t + h / 2, x_half, v)
+        return x_half + h / 2 * v, v, None
+
+
+class Yoshida4Method(_SymplecticMethod):
+    """
+    Yoshida's 4th order method, three velocity verlet steps of sizes w1 h, w0 h and w1 h.
+    https://en.wikipedia.org/wiki/Leapfrog_integration#Yoshida_algorithms
+    """
+    W1 = 1 / (2 - 2 ** (1 / 3))
+    W0 = -2 ** (1 / 3) / (2 - 2 ** (1 / 3))
+
+    def _advance(self, acceleration: Callable, t: float, x, v, a, h: float):
+        for w in (self.W1, self.W0, self.W1):
+            x, v, a = VelocityVerletMethod._advance(self, acceleration, t, x, v, a, w * h)
+            t = t + w * h
+        return x, v, a
+
+
+def _rms(x) -> float:
+    return float(np.sqrt(np.mean(np.square(x))))
+
+
+def _ensemble_rms(x) -> np.ndarray:
+    # one norm per trajectory, the last axis runs over the trajectories
+    return np.sqrt(np.mean(np.square(x).reshape(-1, np.shape(x)[-1]), axis=0))
+
+
+class DenseOutput:
+    """
+    A continuous solution built from the interpolants of every accepted step,
+    call it with a time (or an array of times) between t0 and tf
+    """
+
+    def __init__(self, ts: np.ndarray, hs: np.ndarray, ys: np.ndarray, qs: np.ndarray):
+        self.ts = ts
+        self.hs = hs
+        self.ys = ys
+        self.qs = qs
+
+    @property
+    def t0(self) -> float:
+        return float(self.ts[0])
+
+    @property
+    def tf(self) -> float:
+        return float(self.ts[-1] + self.hs[-1])
+
+    def __call__(self, t):
+        t = np.asarray(t, dtype=np.float64)
+        step = np.clip(np.searchsorted(self.ts, t, side='right') - 1, 0, len(self.ts) - 1)
+        theta = (t - self.ts[step]) / self.hs[step]
+
+        # y = y_old + h * Q . [theta, theta^2, ...]
+        state = (1,) * (self.ys.ndim - 1)
+        powers = np.cumprod(np.repeat(theta[..., np.newaxis], self.qs.shape[-1], axis=-1), axis=-1)
+        powers = powers.reshape(t.shape + state + powers.shape[-1:])
+        h = self.hs[step].reshape(t.shape + state)
+        return self.ys[step] + h * np.sum(self.qs[step] * powers, axis=-1)
+
+
+class DormandPrinceMethod(DiffEqSolverBase):
+    """
+    The Dormand–Prince 5(4) embedded Runge-Kutta method with adaptive step size.
+
+    Each step estimates its local error from the embedded 4th order solution,
+    steps with error above the tolerance are rejected and retried with a smaller step.
+    https://en.wikipedia.org/wiki/Dormand%E2%80%93Prince_method
+    """
+    C = np.array([0, 1 / 5, 3 / 10, 4 / 5, 8 / 9, 1, 1])
+    A = np.array([
+        [0, 0, 0, 0, 0, 0, 0],
+        [1 / 5, 0, 0, 0, 0, 0, 0],
+        [3 / 40, 9 / 40, 0, 0, 0, 0, 0],
+        [44 / 45, -56 / 15, 32 / 9, 0, 0, 0, 0],
+        [19372 / 6561, -25360 / 2187, 64448 / 6561, -212 / 729, 0, 0, 0],
+        [9017 / 3168, -355 / 33, 46732 / 5247, 49 / 176, -5103 / 18656, 0, 0],
+        [35 / 384, 0, 500 / 1113, 125 / 192, -2187 / 6784, 11 / 84, 0],
+    ])
+    B = np.array([35 / 384, 0, 500 / 1113, 125 / 192, -2187 / 6784, 11 / 84, 0])
+    # difference between the 5th and embedded 4th order weights
+    E = np.array([71 / 57600, 0, -71 / 16695, 71 / 1920, -17253 / 339200, 22 / 525, -1 / 40])
+    # coefficients of the 4th order continuous extension, in powers of theta
+    P = np.array([
+        [1, -8048581381 / 2820520608, 8663915743 / 2820520608, -12715105075 / 11282082432],
+        [0, 0, 0, 0],
+        [0, 131558114200 / 32700410799, -68118460800 / 10900136933, 87487479700 / 32700410799],
+        [0, -1754552775 / 470086768, 14199869525 / 1410260304, -10690763975 / 1880347072],
+        [0, 127303824393 / 49829197408, -318862633887 / 49829197408, 701980252875 / 199316789632],
+        [0, -282668133 / 205662961, 2019193451 / 616988883, -1453857185 / 822651844],
+        [0, 40617522 / 29380423, -110615467 / 29380423, 69997945 / 29380423],
+    ])
+    ORDER = 5
+
+    SAFETY = 0.9
+    MIN_FACTOR = 0.2
+    MAX_FACTOR = 10
+
+    def __init__(self, rtol: float = 1e-6, atol: float = 1e-9, step_size: float = None,
+                 max_step: float = math.inf, max_steps: int = 10 ** 6):
+        """
+        :param rtol: Relative tolerance of the local error
+        :param atol: Absolute tolerance of the local error
+        :param step_size: The first step size, estimated when None
+        :param max_step: Largest step allowed
+        :param max_steps: Give up after this many attempted steps
+        """
+        self.rtol = rtol
+        self.atol = atol
+        self.step_size = step_size
+        self.max_step = max_step
+        self.max_steps = max_steps
+
+        # statistics of the last solve
+        self.evaluations = 0
+        self.rejected = 0
+        self.dense = None
+
+    def _initial_step(self, f: Callable, t0, y0: np.ndarray, f0: np.ndarray, direction: float, norm=_rms):
+        # Hairer, Norsett and Wanner, Solving ODEs I, section II.4
+        scale = self.atol + np.abs(y0) * self.rtol
+        d0 = norm(y0 / scale)
+        d1 = norm(f0 / scale)
+        h0 = np.where((d0 < 1e-5) | (d1 < 1e-5), 1e-6, 0.01 * d0 / np.maximum(d1, 1e-300))
+
+        f1 = np.asarray(f(t0 + direction * h0, y0 + direction * h0 * f0), dtype=np.float64)
+        self.evaluations += 1
+        d2 = norm((f1 - f0) / scale) / h0
+
+        h1 = np.where((d1 <= 1e-15) & (d2 <= 1e-15), np.maximum(1e-6, h0 * 1e-3),
+                      (0.01 / np.maximum(np.maximum(d1, d2), 1e-300)) ** (1 / self.ORDER))
+        return np.minimum(np.minimum(100 * h0, h1), self.max_step)
+
+    def _step(self, f: Callable, t, y: np.ndarray, k1: np.ndarray, h, norm=_rms):
+        """
+        Takes one step of size h, returning the new state, the stage derivatives and the scaled error norm.
+        For ensembles t and h hold one value per trajectory and *norm* gives one error per trajectory
+        """
+        K = np.empty((len(self.C),) + y.shape)
+        K[0] = k1
+        for i in range(1, len(self.C)):
+            K[i] = f(t + self.C[i] * h, y + h * np.tensordot(self.A[i, :i], K[:i], axes=1))
+        self.evaluations += len(self.C) - 1
+
+        y_new = y + h * np.tensordot(self.B[:-1], K[:-1], axes=1)
+        # first same as last, the final stage is evaluated at the new point
+        K[-1] = f(t + h, y_new)
+        self.evaluations += 1
+
+        error = h * np.tensordot(self.E, K, axes=1)
+        scale = self.atol + np.maximum(np.abs(y), np.abs(y_new)) * self.rtol
+        return y_new, K, norm(error / scale)
+
+    def _iterate(self, f: Callable, e0, t0: float, tf: float):
+        """
+        Generates (t, y, h, K) for every accepted step, where the step went from t - h to t
+        """
+        y = np.asarray(e0, dtype=np.float64)
+        t = t0
+        direction = 1.0 if tf >= t0 else -1.0
+
+        k1 = np.asarray(f(t, y), dtype=np.float64)
+        self.evaluations = 1
+        self.rejected = 0
+
+        h = self.step_size if self.step_size is not None else float(self._initial_step(f, t, y, k1, direction))
+        attempts = 0
+        while direction * (tf - t) > 0:
+            attempts += 1
+            if attempts > self.max_steps:
+                raise ArithmeticError(f"exceeded {self.max_steps} steps before reaching tf")
+
+            h = min(h, self.max_step, abs(tf - t))
+            y_new, K, error = self._step(f, t, y, k1, direction * h)
+
+            if error <= 1:
+                factor = self.MAX_FACTOR if error == 0 else min(self.MAX_FACTOR, self.SAFETY * error ** (-1 / self.ORDER))
+                t_new = tf if abs(tf - t) <= h else t + direction * h
+                yield t_new, y_new, direction * h, K
+                t, y, k1 = t_new, y_new, K[-1]
+                h = h * factor
+            else:
+                self.rejected += 1
+                h = h * max(self.MIN_FACTOR, self.SAFETY * error ** (-1 / self.ORDER))
+                if t + direction * h == t:
+                    raise ArithmeticError(f"step size underflow at t={t}")
+
+    def _steps(self, equation: Callable, e0, t0: float, tf: float) -> Iterator[Tuple[float, Any]]:
+        yield t0, e0
+        for t, y, _, _ in self._iterate(equation, e0, t0, tf):
+            yield t, y
+
+    def _interpolated_steps(self, equation: Callable, e0, t0: float, tf: float):
+        y = np.asarray(e0, dtype=np.float64)
+        for t, y_new, h, K in self._iterate(equation, e0, t0, tf):
+            # the step's own continuous extension
+            dense = DenseOutput(np.array([t - h]), np.array([h]), y[np.newaxis],
+                                np.tensordot(K, self.P, axes=(0, 0))[np.newaxis])
+            yield t, y_new, dense
+            y = y_new
+
+    def solve_dense(self, equation: Callable, e0, t0: float, tf: float) -> DenseOutput:
+        """
+        Solve like *solve*, but return a continuous solution that can be evaluated at any time from t0 to tf
 
-        return out
+        :param equation: The differential equation of form (t, q) -> num
+        :param e0: The initial conditions, could be a list
+        :param t0: The initial time
+        :param tf: The final time
+        :return: The dense output
+        """
+        dzdt, initial = self._reduce(equation, e0)
+        ts, hs, ys, qs = [], [], [], []
+        y = np.asarray(initial, dtype=np.float64)
+        for t, y_new, h, K in self._iterate(dzdt, initial, t0, tf):
+            ts.append(t - h)
+            hs.append(h)
+            ys.append(y)
+            qs.append(np.tensordot(K, self.P, axes=(0, 0)))
+            y = y_new
+
+        self.dense = DenseOutput(np.asarray(ts), np.asarray(hs), np.asarray(ys), np.asarray(qs))
+        return self.dense
+
+    def solve_ensemble(self, equation: Callable, e0s, t0: float, tf: float, params=None,
+                       save_every: Optional[int] = 1, t_eval=None) -> Trajectory:
+        """
+        Solve many initial conditions (or parameter sets) at once, see DiffEqSolverBase.solve_ensemble.
+
+        Every trajectory keeps its own time and adaptive step size, all of them are stepped together
+        and finished trajectories drop out of the batch. The equation is called with t as an (M,) array,
+        so it has to broadcast over t as well as the state.
+        As the steps differ between trajectories, the solution is sampled at the shared times *t_eval*
+        from each step's continuous extension, *save_every* then applies to those samples
+
+        :param equation: The differential equation of form (t, q) -> num or (t, q, p) -> num
+        :param e0s: (M, dim) initial conditions, (M,) for first order equations,
+                    or with *params* a scalar initial condition shared by every parameter set
+        :param t0: The initial time
+        :param tf: The final time
+        :param params: (M, p) parameters of each trajectory, or (M,) for a single parameter p[0]
+        :param save_every: Only store every nth time of t_eval, None to only store the first and last
+        :param t_eval: Sorted times from t0 to tf to sample, defaults to [t0, tf]
+        :return: The trajectory, ys has shape (n, M, dim)
+        """
+        dzdt, y = self._ensemble(equation, e0s, params)
+        direction = 1.0 if tf >= t0 else -1.0
+
+        t_eval = np.asarray([t0, tf] if t_eval is None else t_eval, dtype=np.float64)
+        forward = direction * t_eval
+        if np.any(np.diff(forward) < 0) or np.any(forward < direction * t0) or np.any(forward > direction * tf):
+            raise ValueError("t_eval must be sorted from t0 to tf")
+
+        count = y.shape[-1]
+        samples = np.empty(t_eval.shape + y.shape)
+        # the points at t0 are the initial conditions
+        cursor = np.full(count, np.searchsorted(forward, direction * t0, side='right'), dtype=np.intp)
+        samples[:cursor[0]] = y
+
+        t = np.full(count, float(t0))
+        k1 = np.array(dzdt(t, y), dtype=np.float64)
+        self.evaluations = 1
+        self.rejected = 0
+        if self.step_size is not None:
+            h = np.full(count, float(self.step_size))
+        else:
+            h = self._initial_step(dzdt, t, y, k1, direction, norm=_ensemble_rms)
+
+        active = np.arange(count)
+        attempts = 0
+        while len(active) > 0:
+            attempts += 1
+            if attempts > self.max_steps:
+                raise ArithmeticError(f"exceeded {self.max_steps} steps before reaching tf")
+
+            ta = t[active]
+            ya = y[..., active]
+            ha = np.minimum(np.minimum(h[active], self.max_step), np.abs(tf - ta))
+            y_new, K, error = self._step(lambda s, q: dzdt(s, q, active), ta, ya, k1[..., active],
+                                         direction * ha, norm=_ensemble_rms)
+
+            accepted = error <= 1
+            with np.errstate(divide='ignore'):
+                scaled = self.SAFETY * error ** (-1 / self.ORDER)
+            factor = np.where(accepted, np.minimum(self.MAX_FACTOR, scaled), np.maximum(self.MIN_FACTOR, scaled))
+            t_new = np.where(np.abs(tf - ta) <= ha, tf, ta + direction * ha)
+
+            # sample the accepted steps at the t_eval points they passed over
+            qs = np.tensordot(K, self.P, axes=(0, 0))
+            local = np.flatnonzero(accepted)
+            while len(local) > 0:
+                local = local[cursor[active[local]] < len(t_eval)]
+                local = local[direction * (t_eval[cursor[active[local]]] - t_new[local]) <= 0]
+                if len(local) == 0:
+                    break
+                at = cursor[active[local]]
+                theta = (t_eval[at] - ta[local]) / (direction * ha[local])
+                powers = theta[:, np.newaxis] ** np.arange(1, qs.shape[-1] + 1)
+                values = ya[..., local] + direction * ha[local] * np.sum(qs[..., local, :] * powers, axis=-1)
+                samples[at, ..., active[local]] = np.moveaxis(values, -1, 0)
+                cursor[active[local]] += 1
+
+            done = active[accepted]
+            t[done] = t_new[accepted]
+            y[..., done] = y_new[..., accepted]
+            k1[..., done] = K[-1][..., accepted]
+            h[active] = ha * factor
+
+            failed = ~accepted
+            self.rejected += int(np.count_nonzero(failed))
+            if np.any(ta[failed] + direction * h[active[failed]] == ta[failed]):
+                raise ArithmeticError(f"step size underflow at t={ta[failed][0]}")
+
+            active = active[direction * (tf - t[active]) > 0]
+
+        out = Trajectory(y, save_every=save_every, capacity=max(len(t_eval), 1), transpose=True)
+        for time, sample in zip(t_eval, samples):
+            out.append(time, sample)
+        return out.finish()
+
+
+# the 5th order solution of Dormand-Prince, without its error estimate
+RKMethod.METHODS['rk45'] = (DormandPrinceMethod.A[:6, :6], DormandPrinceMethod.C[:6], DormandPrinceMethod.B[:6])
+
+
+def _real_part(value):
+    # an equation written with DualNumber functions returns dual numbers (with no dual part) for float states
+    if isinstance(value, DualNumber):
+        return value.real
+    if isinstance(value, (list, tuple)) or (isinstance(value, np.ndarray) and value.dtype == object):
+        return np.asarray([_real_part(v) for v in value], dtype=np.float64)
+    return value
+
+
+def _object_vector(value) -> np.ndarray:
+    # the flattened dual numbers of an equation's result, each kept whole
+    if isinstance(value, (list, tuple, np.ndarray)):
+        items = [item for v in value for item in _object_vector(v)]
+    else:
+        items = [value]
+    vector = np.empty(len(items), dtype=object)
+    for i, item in enumerate(items):
+        vector[i] = item
+    return vector
+
+
+class _ImplicitMethod(DiffEqSolverBase, ABC):
+    """
+    Shared machinery of the implicit solvers: jacobians, cached LU factorizations and newton iterations.
+
+    The state is flattened to a vector internally, so scalar and array states are handled alike.
+    An ensemble is kept as a (dim, M) matrix instead, with (M, dim, dim) jacobians solved together
+    """
+
+    def __init__(self, step_size: float = 0.1, jacobian: Union[None, str, Callable] = None,
+                 tolerance: float = 1e-8, max_iterations: int = 10):
+        """
+        :param step_size: The fixed step size
+        :param jacobian: None for finite differences, 'dual' to use DualNumber forward mode
+                         (the equation may use +-*/, numpy's exp, log, sin, cos and sqrt, or the DualNumber functions),
+                         or a function (t, q) -> matrix of the first order system
+                         (for ensembles q is (dim, M) and the matrix entries are (M,) arrays)
+        :param tolerance: Newton iterations stop when the update is below this (relative to the state size)
+        :param max_iterations: Newton iterations before the jacobian is refreshed
+        """
+        self.step_size = step_size
+        self.jacobian = jacobian
+        self.tolerance = tolerance
+        self.max_iterations = max_iterations
+
+        # statistics of the last solve
+        self.evaluations = 0
+        self.jacobian_evaluations = 0
+        self.factorizations = 0
+
+        self._lu = None
+        self._lu_scale = None
+        self._jac = None
+        # set while solving an ensemble, the state is then (dim, M)
+        self._batched = False
+
+    def _flat(self, equation: Callable, e0):
+        shape = np.shape(e0)
+        # keep the trajectories of an ensemble on the last axis
+        flat_shape = (-1, shape[-1]) if self._batched else (-1,)
+
+        def f(t, z):
+            self.evaluations += 1
+            # [()] hands a scalar state to the equation as a number rather than a 0-d array
+            dz = equation(t, z.reshape(shape)[()])
+            if z.dtype == object:
+                # forward mode jacobian, numpy would unpack the MultiDual results as (value, gradient) pairs
+                return _object_vector(dz)
+            return np.reshape(_real_part(dz), flat_shape)
+
+        def unflat(z):
+            return z.reshape(shape)[()]
+
+        return f, np.reshape(np.asarray(e0, dtype=np.float64), flat_shape).copy(), unflat
+
+    def _reset(self):
+        self.evaluations = 0
+        self.jacobian_evaluations = 0
+        self.factorizations = 0
+        self._lu = None
+        self._lu_scale = None
+        self._jac = None
+
+    def _compute_jacobian(self, f: Callable, t: float, y: np.ndarray, fy: np.ndarray) -> np.ndarray:
+        self.jacobian_evaluations += 1
+        if callable(self.jacobian):
+            jac = np.asarray(self.jacobian(t, y), dtype=np.float64)
+            if self._batched:
+                # (dim, dim, M) entries to one (dim, dim) matrix per trajectory
+                jac = np.broadcast_to(jac.reshape(len(y), len(y), -1), (len(y), len(y), y.shape[-1]))
+                return np.moveaxis(jac, -1, 0)
+            return np.atleast_2d(jac)
+
+        if self.jacobian == 'dual':
+            return np.atleast_2d(dual_jacobian(lambda q: f(t, q), y))
+
+        # forward differences, one column per state variable, perturbing every trajectory of an ensemble at once
+        jac = np.empty((len(fy), len(y)) + y.shape[1:])
+        for j in range(len(y)):
+            step = math.sqrt(np.finfo(float).eps) * np.maximum(1.0, np.abs(y[j]))
+            shifted = y.copy()
+            shifted[j] += step
+            jac[:, j] = (f(t, shifted) - fy) / step
+        return np.moveaxis(jac, -1, 0) if self._batched else jac
+
+    def _factor(self, scale: float):
+        # M = I - scale * J, an ensemble keeps the stacked matrices for np.linalg.solve
+        matrix = np.eye(self._jac.shape[-1]) - scale * self._jac
+        self._lu = matrix if self._batched else lu_factor(matrix)
+        self._lu_scale = scale
+        self.factorizations += 1
+
+    def _linear_solve(self, b: np.ndarray) -> np.ndarray:
+        # solves M x = b with the current factorization
+        if self._batched:
+            return np.linalg.solve(self._lu, b.T[..., np.newaxis])[..., 0].T
+        return lu_solve(self._lu, b)
+
+    def _ensure_factored(self, f: Callable, t: float, y: np.ndarray, scale: float):
+        if self._jac is None:
+            self._jac = self._compute_jacobian(f, t, y, f(t, y))
+            self._lu = None
+        if self._lu is None or self._lu_scale != scale:
+            self._factor(scale)
+
+    def _newton(self, f: Callable, t: float, guess: np.ndarray, c: np.ndarray, scale: float) -> np.ndarray:
+        """
+        Solves z = c + scale * f(t, z) with simplified newton iterations,
+        reusing the factorization of I - scale * J until it stops converging
+        """
+        for refreshed in (False, True):
+            self._ensure_factored(f, t, guess, scale)
+            z = guess.copy()
+            for _ in range(self.max_iterations):
+                residual = z - c - scale * f(t, z)
+                dz = self._linear_solve(-residual)
+                z += dz
+                # one norm per trajectory of an ensemble
+                if np.all(np.linalg.norm(dz, axis=0) <= self.tolerance * (1 + np.linalg.norm(z, axis=0))):
+                    return z
+
+            if refreshed:
+                break
+            # the jacobian has gone stale, recompute it at the latest iterate and carry on from there
+            self._jac = None
+            if np.all(np.isfinite(z)):
+                guess = z
+
+        raise ArithmeticError(f"newton iterations did not converge at t={t}")
+
+    def solve_ensemble(self, equation: Callable, e0s, t0: float, tf: float, params=None,
+                       save_every: Optional[int] = 1) -> Trajectory:
+        """
+        Solve many initial conditions (or parameter sets), see DiffEqSolverBase.solve_ensemble.
+
+        The newton systems of different trajectories are independent, so rather than factorizing one
+        (M dim) square matrix every trajectory gets its own (dim, dim) jacobian and the stacked systems
+        are solved together. 'dual' jacobians are not supported, use finite differences or a function
+        """
+        if self.jacobian == 'dual':
+            raise ValueError("'dual' jacobians are not supported for ensembles")
+
+        self._batched = True
+        try:
+            return super().solve_ensemble(equation, e0s, t0, tf, params, save_every)
+        finally:
+            self._batched = False
+
+
+class BackwardEulerMethod(_ImplicitMethod):
+    """
+    The implicit (backward) euler method, y_(n+1) = y_n + h f(t_(n+1), y_(n+1)).
+    It is L-stable, so stiff equations can use steps far larger than explicit methods allow
+    """
+
+    def _steps(self, equation: Callable, e0, t0: float, tf: float) -> Iterator[Tuple[float, Any]]:
+        self._reset()
+        f, y, unflat = self._flat(equation, e0)
+        h = self.step_size
+
+        t = t0
+        yield t, e0
+        while t <= tf:
+            y = self._newton(f, t + h, y, y, h)
+            t = t + h
+            yield t, unflat(y)
+
+
+class BDFMethod(_ImplicitMethod):
+    """
+    Fixed step backward differentiation formulas of order 1 to 5.
+    https://en.wikipedia.org/wiki/Backward_differentiation_formula
+
+    The history of the first steps is built with extrapolated backward euler steps of the same order,
+    so the startup does not limit the accuracy of the higher orders
+    """
+    # order: (beta, coefficients of y_n, y_(n-1), ...) in y_(n+1) = sum(a_j y_(n-j)) + h beta f(y_(n+1))
+    FORMULAS = {
+        1: (1, [1]),
+        2: (2 / 3, [4 / 3, -1 / 3]),
+        3: (6 / 11, [18 / 11, -9 / 11, 2 / 11]),
+        4: (12 / 25, [48 / 25, -36 / 25, 16 / 25, -3 / 25]),
+        5: (60 / 137, [300 / 137, -300 / 137, 200 / 137, -75 / 137, 12 / 137]),
+    }
+
+    def __init__(self, step_size: float = 0.1, order: int = 2, **kwargs):
+        """
+        :param step_size: The fixed step size
+        :param order: Order of the formula, from 1 to 5
+        :param kwargs: Newton and jacobian options, see _ImplicitMethod
+        """
+        super().__init__(step_size, **kwargs)
+
+        if order not in BDFMethod.FORMULAS:
+            raise ValueError(f"BDF order must be from 1 to 5, got {order}")
+        self.order = order
 
+    def _extrapolated_step(self, f: Callable, t: float, y: np.ndarray, h: float) -> np.ndarray:
+        """
+        One step of size h by backward euler with 1, 2, ..., order substeps, extrapolated to h -> 0.
+        The local error is O(h^(order + 1)) and, like backward euler, it is stable for stiff equations
+        """
+        table = []
+        for n in range(1, self.order + 1):
+            z = y
+            for i in range(1, n + 1):
+                z = self._newton(f, t + i * h / n, z, z, h / n)
+
+            # aitken-neville on the error expansion of backward euler in powers of h / n
+            row = [z]
+            for k in range(1, n):
+                row.append(row[k - 1] + (row[k - 1] - table[-1][k - 1]) / (n / (n - k) - 1))
+            table.append(row)
+        return table[-1][-1]
+
+    def _steps(self, equation: Callable, e0, t0: float, tf: float) -> Iterator[Tuple[float, Any]]:
+        self._reset()
+        f, y, unflat = self._flat(equation, e0)
+        h = self.step_size
+        history = [y]
+
+        t = t0
+        yield t, e0
+        while t <= tf:
+            if len(history) < self.order:
+                y = self._extrapolated_step(f, t, y, h)
+            else:
+                beta, coefficients = BDFMethod.FORMULAS[self.order]
+                c = sum(a * past for a, past in zip(coefficients, history))
+                # extrapolate the last two points as the newton starting guess
+                guess = 2 * history[0] - history[1] if len(history) > 1 else history[0]
+                y = self._newton(f, t + h, guess, c, h * beta)
+            t = t + h
+            yield t, unflat(y)
+
+            history.insert(0, y)
+            del history[self.order:]
+
+
+class RosenbrockMethod(_ImplicitMethod):
+    """
+    The two stage, second order, L-stable Rosenbrock method ROS2.
+    Each step solves two linear systems with the same matrix instead of running newton iterations,
+    and stays second order with an outdated jacobian, so one factorization is reused for *refresh* steps
+
+    (I - g h J) k1 = f(t, y) + g h df/dt
+    (I - g h J) k2 = f(t + h, y + h k1) - 2 k1 - g h df/dt
+    y_(n+1) = y_n + 3/2 h k1 + 1/2 h k2,   g = 1 + 1/sqrt(2)
+    """
+    GAMMA = 1 + 1 / math.sqrt(2)
+
+    def __init__(self, step_size: float = 0.1, refresh: int = 1, **kwargs):
+        """
+        :param step_size: The fixed step size
+        :param refresh: Recompute the jacobian every *refresh* steps
+        :param kwargs: Jacobian options, see _ImplicitMethod
+        """
+        super().__init__(step_size, **kwargs)
+        self.refresh = refresh
+
+    def _steps(self, equation: Callable, e0, t0: float, tf: float) -> Iterator[Tuple[float, Any]]:
+        self._reset()
+        f, y, unflat = self._flat(equation, e0)
+        h = self.step_size
+
+        t = t0
+        yield t, e0
+        steps = 0
+        while t <= tf:
+            if steps % self.refresh == 0:
+                self._jac = None
+            self._ensure_factored(f, t, y, self.GAMMA * h)
+
+            fy = f(t, y)
+            # time derivative of f, keeps second order for non-autonomous equations
+            dt = math.sqrt(np.finfo(float).eps) * max(1.0, abs(t))
+            ft = self.GAMMA * h * (f(t + dt, y) - fy) / dt
+
+            k1 = self._linear_solve(fy + ft)
+            k2 = self._linear_solve(f(t + h, y + h * k1) - 2 * k1 - ft)
+            y = y + 1.5 * h * k1 + 0.5 * h * k2
+            t = t + h
+            steps += 1
+            yield t, unflat(y)
 
-# TODO: make RKMethod with error acceptance and implicit methods
 
 def _test_dif(t, q):
     import math
@@ -3,11 +3,71 @@ import math
 
 import numpy as np
 
+from mathmatics.calculus.common import evaluate
 from utilities.markers import Proxy
 from functools import lru_cache
 
 
-def inverse_fourier_transform(F, t):
+def _chirp_z(values: np.ndarray, count: int, start: float, step: float) -> np.ndarray:
+    """
+    X_k = sum(values_n e^(-2 pi i (start n + step n k))) for k < count, with Bluestein's algorithm
+    using the FFT in O((N + count) log(N + count))\n
+    https://en.wikipedia.org/wiki/Chirp_Z-transform
+
+    nk = (n^2 + k^2 - (k - n)^2) / 2 turns the sum into a convolution with a chirp
+    """
+    n = len(values)
+    length = 1 << int(math.ceil(math.log2(n + count - 1)))
+    ns = np.arange(n, dtype=np.float64)
+    ks = np.arange(count, dtype=np.float64)
+
+    weighted = values * np.exp(-2j * np.pi * (start * ns + step * ns ** 2 / 2))
+    # the chirp from -(n - 1) to count - 1, wrapped around for the circular convolution
+    chirp = np.zeros(length, dtype=np.complex128)
+    chirp[:count] = np.exp(1j * np.pi * step * ks ** 2)
+    chirp[length - n + 1:] = np.exp(1j * np.pi * step * ns[n - 1:0:-1] ** 2)
+
+    convolved = np.fft.ifft(np.fft.fft(weighted, length) * np.fft.fft(chirp))[:count]
+    return np.exp(-1j * np.pi * step * ks ** 2) * convolved
+
+
+def continuous_fourier_transform(f, v, window: float = 100, dx: float = 0.01, chunk_size: int = 2 ** 22):
+    """
+    The Fourier Transform from f(t) to F(v) at many frequencies at once, f is sampled once
+    from -window to window and the integral is a sum over the samples.
+
+    Evenly spaced frequencies are evaluated together with the chirp-z transform,
+    others with a direct sum over chunks of frequencies
+
+    :param f: complex function of the time domain, called with an array of times when it accepts them
+    :param v: frequency, or an array of frequencies
+    :param window: f is integrated from -window to window
+    :param dx: The sample spacing of f
+    :param chunk_size: Largest number of terms held at once by the direct sum
+    :return: complex function of the frequency domain at the frequencies *v*
+    """
+    vs = np.asarray(v, dtype=np.float64)
+    flat = np.atleast_1d(vs).ravel()
+
+    xs = -window + dx * np.arange(int(math.floor(2 * window / dx + 1e-9)) + 1)
+    fs = evaluate(f, xs).astype(np.complex128)
+
+    step = flat[1] - flat[0] if len(flat) > 2 else 0
+    if step != 0 and np.allclose(np.diff(flat), step, rtol=1e-9, atol=0):
+        sums = _chirp_z(fs, len(flat), flat[0] * dx, step * dx)
+        # the samples start at -window rather than 0
+        sums *= np.exp(2j * np.pi * (flat[0] + step * np.arange(len(flat))) * window)
+    else:
+        sums = np.empty(len(flat), dtype=np.complex128)
+        rows = max(chunk_size // len(xs), 1)
+        for i in range(0, len(flat), rows):
+            sums[i:i + rows] = np.exp(-2j * np.pi * np.multiply.outer(flat[i:i + rows], xs)) @ fs
+
+    result = (sums * dx).reshape(vs.shape)
+    return complex(result) if result.ndim == 0 else result
+
+
+def inverse_fourier_transform(F, t, window: float = 100, dx: float = 0.01):
     """
     The Inverse Fourier Transform from F(v) to f(t)
 
@@ -17,22 +77,16 @@ def inverse_fourier_transform(F, t):
     Returns a function of the time domain evaluated at time t
 
     :param F: complex function of the frequency domain
-    :param t: time
+    :param t: time, or an array of times evaluated together, see continuous_fourier_transform
+    :param window: F is integrated from -window to window
+    :param dx: The sample spacing of F
     :return: complex function of the time domain at time *t*
     """
+    # the inverse is the forward transform at -t
+    return continuous_fourier_transform(F, np.negative(t), window, dx)
 
-    infty = 100
-
-    total = 0
-    x = -infty
-    while x <= infty:
-        total += F(x) * cmath.exp(2j * cmath.pi * x * t) * 0.01
-        x += 0.01
-
-    return total
 
-
-def fourier_transform(f, v):
+def fourier_transform(f, v, window: float = 100, dx: float = 0.01):
     """
     The Fourier Transform from f(t) to F(v)
 
@@ -42,73 +96,164 @@ def fourier_transform(f, v):
     Returns a function of the frequency domain evaluated at frequency v
 
     :param f: complex function of the time domain
-    :param v: frequency
+    :param v: frequency, or an array of frequencies evaluated together, see continuous_fourier_transform
+    :param window: f is integrated from -window to window
+    :param dx: The sample spacing of f
     :return: complex function of the frequency domain at frequency *v*
     """
+    return continuous_fourier_transform(f, v, window, dx)
+
+
+def dft(points) -> np.ndarray:
+    """
+    The Discrete Fourier Transform of every frequency at once with the FFT, in O(N log N)\n
+    F(k) = sum(f(n) e^(-2 pi i k n / N)), so dft(points)[k] == discrete_fourier_transform(points, k)
 
-    infty = 100
+    :param points: The samples
+    :return: The N complex fourier coefficients
+    """
+    return np.fft.fft(np.asarray(points))
 
-    total = 0
-    x = -infty
-    while x <= infty:
-        total += f(x) * cmath.exp(-2j * cmath.pi * v * x) * 0.01
-        x += 0.01
 
-    return total
+def idft(coefficients) -> np.ndarray:
+    """
+    The Inverse Discrete Fourier Transform of every sample at once with the FFT, the inverse of dft\n
+    f(n) = sum(F(k) e^(2 pi i k n / N)) / N
+
+    :param coefficients: The N fourier complex coefficients
+    :return: The N complex samples
+    """
+    return np.fft.ifft(np.asarray(coefficients))
+
+
+def dft_normalized(points) -> np.ndarray:
+    """
+    The Normalized Discrete Fourier Transform, the coefficients divided by the number of samples,
+    so dft_normalized(points)[k] == discrete_fourier_transform_normalized(points, k / T, T)
+
+    :param points: The samples
+    :return: The N complex fourier coefficients
+    """
+    return np.fft.fft(np.asarray(points)) / len(points)
+
+
+def idft_normalized(coefficients) -> np.ndarray:
+    """
+    The inverse of dft_normalized, the plain sum of the coefficients' waves,
+    so idft_normalized(coefficients)[n] == inverse_discrete_fourier_transform(coefficients, n)
+
+    :param coefficients: The N normalized fourier complex coefficients
+    :return: The N complex samples
+    """
+    return np.fft.ifft(np.asarray(coefficients)) * len(coefficients)
+
+
+def rdft(points) -> np.ndarray:
+    """
+    The Discrete Fourier Transform of real samples, only the N // 2 + 1 non negative frequencies
+    as the rest are their complex conjugates
+
+    :param points: The real samples
+    :return: The N // 2 + 1 complex fourier coefficients
+    """
+    return np.fft.rfft(np.asarray(points))
+
+
+def irdft(coefficients, n: int = None) -> np.ndarray:
+    """
+    The inverse of rdft
+
+    :param coefficients: The non negative frequency coefficients
+    :param n: The number of samples, defaults to 2 (len(coefficients) - 1)
+    :return: The n real samples
+    """
+    return np.fft.irfft(np.asarray(coefficients), n)
+
+
+def rdft_normalized(points) -> np.ndarray:
+    """
+    The Normalized Discrete Fourier Transform of real samples, see rdft and dft_normalized
+
+    :param points: The real samples
+    :return: The N // 2 + 1 complex fourier coefficients
+    """
+    return np.fft.rfft(np.asarray(points)) / len(points)
+
+
+def irdft_normalized(coefficients, n: int = None) -> np.ndarray:
+    """
+    The inverse of rdft_normalized
+
+    :param coefficients: The non negative frequency normalized coefficients
+    :param n: The number of samples, defaults to 2 (len(coefficients) - 1)
+    :return: The n real samples
+    """
+    samples = np.fft.irfft(np.asarray(coefficients), n)
+    return samples * len(samples)
+
+
+def _wave_sum(values, v, sign: int):
+    """
+    sum(values[n] e^(sign 2 pi i v n / N)) at one v or an array of v
+    """
+    values = np.asarray(values)
+    N = len(values)
+    phases = np.multiply.outer(np.asarray(v, dtype=np.float64), np.arange(N)) * (sign * 2 * np.pi / N)
+    result = np.exp(1j * phases) @ values
+    return complex(result) if result.ndim == 0 else result
 
 
 def discrete_fourier_transform(points, v):
     """
-    The Discrete Fourier Transform from f(t) to F(v), evaluated at the frequency v
+    The Discrete Fourier Transform from f(t) to F(v), evaluated at the frequency v.
+    Use dft for the whole spectrum
 
     :param points: The samples
-    :param v: The input frequency relative to the sample period
+    :param v: The input frequency relative to the sample period, or an array of them
     :return: The complex fourier coefficient at the frequency v
     """
-    N = len(points)
-    term = sum([points[n] * cmath.exp(-2j * cmath.pi / N * v * n) for n in range(N)])
-    return term
+    return _wave_sum(points, v, -1)
 
 
 def discrete_fourier_transform_normalized(points, v, T):
     """
-    The Normalized Discrete Fourier Transform from f(t) to F(v), evaluated at the frequency v
+    The Normalized Discrete Fourier Transform from f(t) to F(v), evaluated at the frequency v.
+    Use dft_normalized for the whole spectrum
 
     :param points: The samples
-    :param v: The absolute input frequency
+    :param v: The absolute input frequency, or an array of them
     :param T: The sample period
     :return: The complex fourier coefficient at the frequency v
     """
 
-    return discrete_fourier_transform(points, v * T) / len(points)
+    return discrete_fourier_transform(points, np.multiply(v, T)) / len(points)
 
 
 def inverse_discrete_fourier_transform(coefficients, t):
     """
-    The Inverse Discrete Fourier Transform from F(v) to f(t), evaluated at time t
+    The Inverse Discrete Fourier Transform from F(v) to f(t), evaluated at time t.
+    Use idft_normalized for every sample
 
     :param coefficients: The fourier complex coefficients
-    :param t: The time to be evaluated at
+    :param t: The time to be evaluated at, or an array of them
     :return:
     """
 
-    N = len(coefficients)
-    term = sum([coefficients[k] * cmath.exp(2j * cmath.pi / N * k * t) for k in range(N)])
-    return term
+    return _wave_sum(coefficients, t, 1)
 
 
 def inverse_discrete_fourier_transform_normalized(coefficients, t, T):
     """
-    The Normalized Inverse Discrete Fourier Transform from F(v) to f(t), evaluated at time t
+    The Normalized Inverse Discrete Fourier Transform from F(v) to f(t), evaluated at time t,
+    the inverse of discrete_fourier_transform_normalized
 
-    :param coefficients: The fourier complex coefficients
-    :param t: The time to be evaluated at
+    :param coefficients: The normalized fourier complex coefficients
+    :param t: The time to be evaluated at, or an array of them
     :param T: The sample period
     :return:
     """
 
-    # TODO: Fix this
-    return inverse_discrete_fourier_transform(list(map(lambda c: c * len(coefficients), coefficients)), t / T)
+    return inverse_discrete_fourier_transform(coefficients, np.divide(t, T))
 
 
 @Proxy.runInMainThread
@@ -122,14 +267,14 @@ def simulate_discrete_fourier_transform(fn=lambda x: math.sin(2 * math.pi * x),
     axs[0].plot(xs, ys, 'o')
     axs[0].set_title('Original Signal')
 
-    _xs = range(int(samples / 2))
-    _ys = [discrete_fourier_transform(ys, v) * 2 / samples for v in _xs]
+    _xs = np.arange(int(samples / 2))
+    _ys = dft(ys)[:len(_xs)] * 2 / samples
 
-    _ms = [cmath.polar(y)[0] for y in _ys]
+    _ms = np.abs(_ys)
     axs[1].plot(_xs, _ms, 'o')
     axs[1].set_title('Fourier Coefficients real values')
 
-    _ps = [cmath.polar(y)[1] for y in _ys]
+    _ps = np.angle(_ys)
     axs[2].plot(_xs, _ps, 'o')
     axs[2].set_title('Fourier Coefficients imaginary values')
 
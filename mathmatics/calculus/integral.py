@@ -1,8 +1,13 @@
-import random
-from typing import Callable, Tuple
+import heapq
+import math
+from typing import Callable, Tuple, Sequence
 
 import numpy as np
 
+from mathmatics.calculus.common import evaluate, evaluate_points, sample_statistics, combine_statistics
+from mathmatics.calculus.quadrature import gauss_kronrod_intervals, gauss_cubature, smolyak_cubature
+from mathmatics.calculus.sampling import halton, sobol
+
 
 # Using the left Riemann sums
 def integral(fn: Callable, start: float, end: float, dx: float = 0.01) -> float:
@@ -15,18 +20,186 @@ def integral(fn: Callable, start: float, end: float, dx: float = 0.01) -> float:
     :param dx: dx
     :return: Evaluated result
     """
-    result = 0
-    for x in np.arange(start, end, dx):
-        result += fn(x) * dx
-    return result
+    return np.sum(evaluate(fn, np.arange(start, end, dx))) * dx
+
+
+def adaptive_integral(fn: Callable, start: float, end: float, atol: float = 1e-10, rtol: float = 1e-8,
+                      max_evaluations: int = 100000) -> Tuple[float, float]:
+    """
+    Adaptive Gauss-Kronrod 7/15 quadrature, the subinterval with the largest error estimate is bisected
+    until the total error is within tolerance, so evaluations are spent where fn is hard to integrate (kinks, peaks)
+
+    :param fn: Function to evaluate the integral of
+    :param start: Start of the definite integral
+    :param end: End of the definite integral
+    :param atol: Absolute tolerance of the error estimate
+    :param rtol: Relative tolerance of the error estimate
+    :param max_evaluations: Stop refining before fn would be evaluated more than this many times
+    :return: (integral, error estimate), the error is above the tolerance if the budget ran out
+    """
+    values, errors = gauss_kronrod_intervals(fn, [start], [end])
+    evaluations = 15
+
+    # max heap on the error of each subinterval
+    heap = [(-errors[0], start, end, values[0])]
+    # subintervals too small to split any further
+    final = []
+    value = values[0]
+    error = errors[0]
 
+    while heap and error > max(atol, rtol * abs(value)) and evaluations + 30 <= max_evaluations:
+        item = heapq.heappop(heap)
+        negative_error, a, b, part = item
+        middle = (a + b) / 2
+        if middle == a or middle == b:
+            final.append(item)
+            continue
 
-def monte_carlo_integration(fn: Callable[[float], float], a: float, b: float, samples: int = 1000) -> Tuple[float, float]:
-    answer = sum([fn(random.random() * (b - a) + a) for _ in range(samples)]) * (b - a) / samples
-    s_var = sum([(fn(random.random() * (b - a) + a) - answer) ** 2 for _ in range(samples)]) / (samples - 1) / samples
+        values, errors = gauss_kronrod_intervals(fn, [a, middle], [middle, b])
+        evaluations += 30
+        heapq.heappush(heap, (-errors[0], a, middle, values[0]))
+        heapq.heappush(heap, (-errors[1], middle, b, values[1]))
+        value += values[0] + values[1] - part
+        error += errors[0] + errors[1] + negative_error
 
-    # include variance check
-    return answer, s_var
+    # sum the subintervals again to drop the rounding of the running totals
+    value = math.fsum(item[3] for item in heap + final)
+    error = math.fsum(-item[0] for item in heap + final)
+    return float(value), float(error)
+
+
+def box_integral(fn: Callable, lower: Sequence[float], upper: Sequence[float], method: str = 'gauss',
+                 n: int = 8, level: int = 4) -> float:
+    """
+    Integrates fn(*coordinates) over the box from *lower* to *upper*, e.g. a 3D field over a volume
+
+    :param fn: Function of d variables, called with (n,) coordinate arrays when it accepts them
+    :param lower: Lower corner of the box
+    :param upper: Upper corner of the box
+    :param method: 'gauss' for the tensor product Gauss-Legendre rule (n^d nodes),
+                   'smolyak' for the sparse grid, which needs far fewer nodes from 4 or so dimensions
+    :param n: Gauss nodes per axis
+    :param level: Accuracy level of the sparse grid
+    :return: The integral
+    """
+    if method == 'gauss':
+        return gauss_cubature(fn, lower, upper, n)
+    if method == 'smolyak':
+        return smolyak_cubature(fn, lower, upper, level)
+    raise ValueError(f"unknown cubature method {method}")
+
+
+def _chunks(samples: int, chunk_size: int):
+    for start in range(0, samples, chunk_size):
+        yield start, min(chunk_size, samples - start)
+
+
+def monte_carlo_integral(fn: Callable, lower: Sequence[float], upper: Sequence[float], samples: int = 100000,
+                         method: str = 'random', seed=None, shifts: int = 8, strata: int = None,
+                         importance: Tuple[Callable, Callable] = None,
+                         chunk_size: int = 2 ** 16) -> Tuple[float, float]:
+    """
+    Monte Carlo integration of fn(*coordinates) over the box from *lower* to *upper*.
+    Samples are drawn and evaluated in chunks of *chunk_size*, so memory stays bounded for any number of samples
+
+    The methods are
+        'random': uniform pseudo random points
+        'halton', 'sobol': quasi random points, randomized by *shifts* independent random shifts (mod 1)
+            whose spread gives the error estimate
+        'stratified': the box is split into *strata* cells per axis, with samples spread evenly over the cells
+        'importance': points drawn from a density, importance = (sample, density) where sample(rng, n)
+            gives (n, d) points and density(points) their probability density, points outside the box count as 0
+
+    :param fn: Function of d variables, called with (n,) coordinate arrays when it accepts them
+    :param lower: Lower corner of the box
+    :param upper: Upper corner of the box
+    :param samples: Total number of function evaluations
+    :param method: One of the methods above
+    :param seed: Seed of the numpy random generator, None for a random seed
+    :param shifts: Number of randomized replicates of the quasi random methods
+    :param strata: Cells per axis of the stratified method, defaults to about 4 samples per cell
+    :param importance: (sample, density) of the importance method
+    :param chunk_size: Largest number of points held at once
+    :return: (integral, standard error of the estimate)
+    """
+    lower = np.atleast_1d(np.asarray(lower, dtype=np.float64))
+    upper = np.atleast_1d(np.asarray(upper, dtype=np.float64))
+    dimensions = len(lower)
+    volume = float(np.prod(upper - lower))
+    rng = np.random.default_rng(seed)
+
+    if method == 'random':
+        statistics = (0, 0.0, 0.0)
+        for _, count in _chunks(samples, chunk_size):
+            points = lower + (upper - lower) * rng.random((count, dimensions))
+            statistics = combine_statistics([statistics, sample_statistics(evaluate_points(fn, points))])
+        count, mean, m2 = statistics
+        return float(volume * mean), volume * math.sqrt(m2 / max(count - 1, 1) / count)
+
+    if method in ('halton', 'sobol'):
+        sequence = halton if method == 'halton' else sobol
+        offsets = rng.random((shifts, dimensions))
+        per_shift = max(samples // shifts, 1)
+        sums = np.zeros(shifts)
+        for start, count in _chunks(per_shift, max(chunk_size // shifts, 1)):
+            base = sequence(count, dimensions, skip=start)
+            for i, offset in enumerate(offsets):
+                points = lower + (upper - lower) * ((base + offset) % 1)
+                sums[i] += np.sum(evaluate_points(fn, points))
+        estimates = volume * sums / per_shift
+        return float(np.mean(estimates)), float(np.std(estimates, ddof=1) / math.sqrt(shifts)) if shifts > 1 else math.nan
+
+    if method == 'stratified':
+        if strata is None:
+            strata = max(int((samples / 4) ** (1 / dimensions)), 1)
+        cells = strata ** dimensions
+        # at least two samples per cell for the variance
+        per_cell = max(samples // cells, 2)
+        width = (upper - lower) / strata
+
+        value = 0.0
+        variance = 0.0
+        for start, count in _chunks(cells, max(chunk_size // per_cell, 1)):
+            corners = np.stack(np.unravel_index(np.arange(start, start + count), (strata,) * dimensions), axis=-1)
+            points = lower + width * (corners[:, np.newaxis, :] + rng.random((count, per_cell, dimensions)))
+            values = evaluate_points(fn, points.reshape(-1, dimensions)).reshape(count, per_cell)
+            value += float(np.sum(np.mean(values, axis=1)))
+            variance += float(np.sum(np.var(values, axis=1, ddof=1))) / per_cell
+        cell_volume = volume / cells
+        return cell_volume * value, cell_volume * math.sqrt(variance)
+
+    if method == 'importance':
+        if importance is None:
+            raise ValueError("importance sampling needs importance=(sample, density)")
+        sample, density = importance
+        statistics = (0, 0.0, 0.0)
+        for _, count in _chunks(samples, chunk_size):
+            points = np.asarray(sample(rng, count), dtype=np.float64).reshape(count, dimensions)
+            inside = np.all((points >= lower) & (points <= upper), axis=1)
+            ratios = np.zeros(count)
+            if np.any(inside):
+                ratios[inside] = evaluate_points(fn, points[inside]) / np.asarray(density(points[inside]))
+            statistics = combine_statistics([statistics, sample_statistics(ratios)])
+        count, mean, m2 = statistics
+        return float(mean), math.sqrt(m2 / max(count - 1, 1) / count)
+
+    raise ValueError(f"unknown monte carlo method {method}")
+
+
+def monte_carlo_integration(fn: Callable[[float], float], a: float, b: float, samples: int = 1000,
+                            seed=None) -> Tuple[float, float]:
+    """
+    Monte Carlo integration of fn from a to b with uniform random samples
+
+    :param fn: Function to evaluate the integral of
+    :param a: Start of the definite integral
+    :param b: End of the definite integral
+    :param samples: Number of samples
+    :param seed: Seed of the numpy random generator, None for a random seed
+    :return: (integral, variance of the estimate)
+    """
+    answer, error = monte_carlo_integral(fn, [a], [b], samples, seed=seed)
+    return answer, error ** 2
 
 
 if __name__ == '__main__':
@@ -40,3 +213,11 @@ if __name__ == '__main__':
     ans = quarter_pi * 4
     ans_pm = (pm / quarter_pi) * ans
     print(f"{ans - ans_pm}-{ans + ans_pm}")
+
+    # the quarter circle has an infinite slope at x=1, the bisections concentrate there
+    quarter_pi, error = adaptive_integral(lambda x: np.sqrt(np.maximum(1 - x * x, 0)), 0, 1)
+    print(4 * quarter_pi, 4 * error)
+
+    # volume integral of a gaussian over the unit cube
+    print(box_integral(lambda x, y, z: np.exp(-(x * x + y * y + z * z)), [0, 0, 0], [1, 1, 1]),
+          box_integral(lambda x, y, z: np.exp(-(x * x + y * y + z * z)), [0, 0, 0], [1, 1, 1], method='smolyak'))
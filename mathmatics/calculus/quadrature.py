@@ -0,0 +1,241 @@
+import math
+from functools import lru_cache
+from typing import Callable, Tuple, Sequence, Iterator
+
+import numpy as np
+
+from mathmatics.calculus.common import evaluate, evaluate_points
+
+# Fixed rules for definite integrals, every rule evaluates fn once over an array of all its nodes
+
+# Gauss-Kronrod 7/15 nodes and weights on [-1, 1], from QUADPACK's qk15
+_KRONROD_NODES = np.array([
+    0.991455371120812639206854697526329,
+    0.949107912342758524526189684047851,
+    0.864864423359769072789712788640926,
+    0.741531185599394439863864773280788,
+    0.586087235467691130294144845693013,
+    0.405845151377397166906606412076961,
+    0.207784955007898467600689403773245,
+    0.000000000000000000000000000000000,
+])
+_KRONROD_WEIGHTS = np.array([
+    0.022935322010529224963732008058970,
+    0.063092092629978553290700663189204,
+    0.104790010322250183839876322541518,
+    0.140653259715525918745189590510238,
+    0.169004726639267902826583426598550,
+    0.190350578064785409913256402421014,
+    0.204432940075298892414161999234649,
+    0.209482141084727828012999174891714,
+])
+_GAUSS_WEIGHTS = np.array([
+    0.129484966168869693270611432679082,
+    0.279705391489276667901467771423780,
+    0.381830050505118944950369775488975,
+    0.417959183673469387755102040816327,
+])
+
+# the full rules over the 15 nodes, the 7 point gauss rule uses every other node
+GK15_NODES = np.concatenate((-_KRONROD_NODES[:-1], _KRONROD_NODES[::-1]))
+GK15_WEIGHTS = np.concatenate((_KRONROD_WEIGHTS[:-1], _KRONROD_WEIGHTS[::-1]))
+G7_WEIGHTS = np.zeros(15)
+G7_WEIGHTS[1:7:2] = _GAUSS_WEIGHTS[:3]
+G7_WEIGHTS[7] = _GAUSS_WEIGHTS[3]
+G7_WEIGHTS[9::2] = _GAUSS_WEIGHTS[2::-1]
+
+_EPSILON = np.finfo(np.float64).eps
+_TINY = np.finfo(np.float64).tiny
+
+
+def simpson(fn: Callable, a: float, b: float, n: int = 100) -> float:
+    """
+    The composite Simpson's rule\n
+    https://en.wikipedia.org/wiki/Simpson%27s_rule#Composite_Simpson's_rule
+
+    :param fn: Function to integrate
+    :param a: Start of the definite integral
+    :param b: End of the definite integral
+    :param n: Number of subintervals, rounded up to be even
+    :return: The integral
+    """
+    n += n % 2
+    xs = np.linspace(a, b, n + 1)
+    ys = evaluate(fn, xs)
+    h = (b - a) / n
+    return h / 3 * (ys[0] + ys[-1] + 4 * np.sum(ys[1:-1:2]) + 2 * np.sum(ys[2:-1:2]))
+
+
+@lru_cache(maxsize=None)
+def legendre_rule(n: int) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    The nodes and weights of the n point Gauss-Legendre rule on [-1, 1], read only as they are cached
+    """
+    nodes, weights = np.polynomial.legendre.leggauss(n)
+    nodes.setflags(write=False)
+    weights.setflags(write=False)
+    return nodes, weights
+
+
+def gauss_legendre(fn: Callable, a: float, b: float, n: int = 10, intervals: int = 1) -> float:
+    """
+    Composite Gauss-Legendre quadrature, exact for polynomials up to degree 2n - 1 on each subinterval\n
+    https://en.wikipedia.org/wiki/Gauss%E2%80%93Legendre_quadrature
+
+    :param fn: Function to integrate
+    :param a: Start of the definite integral
+    :param b: End of the definite integral
+    :param n: Number of nodes per subinterval
+    :param intervals: Number of equal subintervals
+    :return: The integral
+    """
+    nodes, weights = legendre_rule(n)
+    edges = np.linspace(a, b, intervals + 1)
+    half = (edges[1:] - edges[:-1]) / 2
+    centres = (edges[1:] + edges[:-1]) / 2
+
+    xs = centres[:, np.newaxis] + half[:, np.newaxis] * nodes
+    return float(np.sum(half * (evaluate(fn, xs) @ weights)))
+
+
+def gauss_kronrod_intervals(fn: Callable, a, b) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    The Gauss-Kronrod 7/15 rule over many intervals at once, all 15 nodes of every interval are evaluated in one call
+
+    :param fn: Function to integrate
+    :param a: Array of interval starts
+    :param b: Array of interval ends
+    :return: (integrals, error estimates) per interval
+    """
+    a = np.asarray(a, dtype=np.float64)
+    b = np.asarray(b, dtype=np.float64)
+    half = (b - a) / 2
+    centre = (a + b) / 2
+    ys = evaluate(fn, centre[..., np.newaxis] + half[..., np.newaxis] * GK15_NODES)
+
+    kronrod = ys @ GK15_WEIGHTS
+    gauss = ys @ G7_WEIGHTS
+
+    # QUADPACK's error estimate, scaled by how rough the integrand is over the interval
+    mean = kronrod / 2
+    absolute = np.abs(ys) @ GK15_WEIGHTS * np.abs(half)
+    roughness = np.abs(ys - mean[..., np.newaxis]) @ GK15_WEIGHTS * np.abs(half)
+    error = np.abs((kronrod - gauss) * half)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        scaled = roughness * np.minimum(1, (200 * error / roughness) ** 1.5)
+    error = np.where((roughness != 0) & (error != 0), scaled, error)
+    error = np.where(absolute > _TINY / (50 * _EPSILON), np.maximum(50 * _EPSILON * absolute, error), error)
+    return kronrod * half, error
+
+
+def gauss_kronrod(fn: Callable, a: float, b: float) -> Tuple[float, float]:
+    """
+    The 15 point Gauss-Kronrod rule, with the embedded 7 point Gauss rule for the error estimate\n
+    https://en.wikipedia.org/wiki/Gauss%E2%80%93Kronrod_quadrature_formula
+
+    :param fn: Function to integrate
+    :param a: Start of the definite integral
+    :param b: End of the definite integral
+    :return: (integral, error estimate)
+    """
+    value, error = gauss_kronrod_intervals(fn, a, b)
+    return float(value), float(error)
+
+
+def _box(lower: Sequence[float], upper: Sequence[float]) -> Tuple[np.ndarray, np.ndarray]:
+    lower = np.atleast_1d(np.asarray(lower, dtype=np.float64))
+    upper = np.atleast_1d(np.asarray(upper, dtype=np.float64))
+    if lower.shape != upper.shape:
+        raise ValueError("the lower and upper corners must have the same dimension")
+    return lower, upper
+
+
+def gauss_cubature(fn: Callable, lower: Sequence[float], upper: Sequence[float], n: int = 8,
+                   chunk_size: int = 2 ** 16) -> float:
+    """
+    Tensor product Gauss-Legendre cubature over a box, n^d nodes evaluated in chunks of *chunk_size*
+
+    :param fn: Function of d variables, called with (n,) coordinate arrays when it accepts them
+    :param lower: Lower corner of the box
+    :param upper: Upper corner of the box
+    :param n: Nodes per axis
+    :param chunk_size: Largest number of nodes evaluated at once
+    :return: The integral
+    """
+    lower, upper = _box(lower, upper)
+    nodes, weights = legendre_rule(n)
+    half = (upper - lower) / 2
+    centre = (upper + lower) / 2
+    shape = (n,) * len(lower)
+
+    total = 0.0
+    for start in range(0, n ** len(lower), chunk_size):
+        index = np.stack(np.unravel_index(np.arange(start, min(start + chunk_size, n ** len(lower))), shape), axis=-1)
+        points = centre + half * nodes[index]
+        total += float(np.sum(evaluate_points(fn, points) * np.prod(weights[index], axis=1)))
+    return total * float(np.prod(half))
+
+
+def _compositions(total: int, parts: int) -> Iterator[Tuple[int, ...]]:
+    """
+    Generates every tuple of *parts* positive integers summing to *total*
+    """
+    if parts == 1:
+        yield total,
+        return
+    for first in range(1, total - parts + 2):
+        for rest in _compositions(total - first, parts - 1):
+            yield (first,) + rest
+
+
+def smolyak_rule(dimensions: int, level: int) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    The Smolyak sparse grid on [-1, 1]^d built from Gauss-Legendre rules of 2l - 1 nodes at level l,
+    with the combination technique. Nodes shared between the tensor grids are merged
+
+    :param dimensions: Dimensions
+    :param level: Accuracy level, 1 is the midpoint rule
+    :return: (nodes (n, d), weights (n,))
+    """
+    q = dimensions + level - 1
+    points, weights = [], []
+    for size in range(max(dimensions, q - dimensions + 1), q + 1):
+        k = q - size
+        coefficient = (-1) ** k * math.factorial(dimensions - 1) // (math.factorial(k) * math.factorial(dimensions - 1 - k))
+        for levels in _compositions(size, dimensions):
+            rules = [legendre_rule(2 * l - 1) for l in levels]
+            grid = np.stack(np.meshgrid(*[rule[0] for rule in rules], indexing='ij'), axis=-1)
+            weight = np.prod(np.stack(np.meshgrid(*[rule[1] for rule in rules], indexing='ij'), axis=-1), axis=-1)
+            points.append(grid.reshape(-1, dimensions))
+            weights.append(coefficient * weight.ravel())
+
+    points = np.concatenate(points)
+    weights = np.concatenate(weights)
+    # the gauss rules share nodes (e.g. the centre), merge them to evaluate each node once
+    points, inverse = np.unique(np.round(points, 14), axis=0, return_inverse=True)
+    return points, np.bincount(np.ravel(inverse), weights=weights, minlength=len(points))
+
+
+def smolyak_cubature(fn: Callable, lower: Sequence[float], upper: Sequence[float], level: int = 4) -> float:
+    """
+    Sparse grid (Smolyak) cubature over a box, needing far fewer nodes than a tensor product rule in higher dimensions
+
+    https://en.wikipedia.org/wiki/Sparse_grid
+
+    :param fn: Function of d variables, called with (n,) coordinate arrays when it accepts them
+    :param lower: Lower corner of the box
+    :param upper: Upper corner of the box
+    :param level: Accuracy level, 1 is the midpoint rule
+    :return: The integral
+    """
+    lower, upper = _box(lower, upper)
+    nodes, weights = smolyak_rule(len(lower), level)
+    half = (upper - lower) / 2
+    points = (upper + lower) / 2 + half * nodes
+    return float(evaluate_points(fn, points) @ weights) * float(np.prod(half))
+
+
+if __name__ == '__main__':
+    print(simpson(math.sin, 0, math.pi))
+    print(gauss_legendre(np.exp, 0, 1), math.e - 1)
+    print(gauss_kronrod(lambda x: x ** 0.5, 0, 1))
@@ -0,0 +1,115 @@
+from typing import List
+
+import numpy as np
+
+# Low discrepancy sequences on the unit cube [0, 1)^d, for quasi Monte Carlo integration.
+# Points are generated from their index, so any chunk of a sequence can be generated on its own
+
+# Joe and Kuo's primitive polynomials and initial direction numbers (new-joe-kuo-6.21201)
+# for dimensions 2 to 16 as (degree s, coefficients a, m_1 ... m_s), the first dimension is the van der Corput sequence
+# https://web.maths.unsw.edu.au/~fkuo/sobol/
+_JOE_KUO = [
+    (1, 0, [1]),
+    (2, 1, [1, 3]),
+    (3, 1, [1, 3, 1]),
+    (3, 2, [1, 1, 1]),
+    (4, 1, [1, 1, 3, 3]),
+    (4, 4, [1, 3, 5, 13]),
+    (5, 2, [1, 1, 5, 5, 17]),
+    (5, 4, [1, 1, 5, 5, 5]),
+    (5, 7, [1, 1, 7, 11, 19]),
+    (5, 11, [1, 1, 5, 1, 1]),
+    (5, 13, [1, 1, 1, 3, 11]),
+    (5, 14, [1, 3, 5, 5, 31]),
+    (6, 1, [1, 3, 3, 9, 7, 49]),
+    (6, 13, [1, 1, 1, 15, 21, 21]),
+    (6, 16, [1, 3, 1, 13, 27, 49]),
+]
+
+SOBOL_BITS = 32
+SOBOL_MAX_DIMENSIONS = len(_JOE_KUO) + 1
+
+
+def _direction_numbers(dimensions: int) -> np.ndarray:
+    """
+    The (dimensions, SOBOL_BITS) direction numbers, scaled to SOBOL_BITS bit integers
+    """
+    directions = np.zeros((dimensions, SOBOL_BITS), dtype=np.uint64)
+    directions[0] = [1 << (SOBOL_BITS - 1 - k) for k in range(SOBOL_BITS)]
+
+    for j, (s, a, m) in enumerate(_JOE_KUO[:dimensions - 1], start=1):
+        v = [m[k] << (SOBOL_BITS - 1 - k) for k in range(s)]
+        for k in range(s, SOBOL_BITS):
+            value = v[k - s] ^ (v[k - s] >> s)
+            for i in range(1, s):
+                if (a >> (s - 1 - i)) & 1:
+                    value ^= v[k - i]
+            v.append(value)
+        directions[j] = v
+    return directions
+
+
+def sobol(count: int, dimensions: int, skip: int = 0) -> np.ndarray:
+    """
+    Points of the Sobol sequence\n
+    https://en.wikipedia.org/wiki/Sobol_sequence
+
+    :param count: Number of points
+    :param dimensions: Dimensions, up to SOBOL_MAX_DIMENSIONS
+    :param skip: Index of the first point
+    :return: (count, dimensions) array of points
+    """
+    if not 1 <= dimensions <= SOBOL_MAX_DIMENSIONS:
+        raise ValueError(f"sobol points are available for 1 to {SOBOL_MAX_DIMENSIONS} dimensions")
+    if skip + count > 2 ** SOBOL_BITS:
+        raise ValueError(f"only 2^{SOBOL_BITS} sobol points are available")
+
+    directions = _direction_numbers(dimensions)
+    index = np.arange(skip, skip + count, dtype=np.uint64)
+    # the gray code of the index picks which direction numbers are xor-ed together
+    gray = index ^ (index >> np.uint64(1))
+
+    points = np.zeros((count, dimensions), dtype=np.uint64)
+    for bit in range(SOBOL_BITS):
+        used = ((gray >> np.uint64(bit)) & np.uint64(1)).astype(bool)
+        points[used] ^= directions[:, bit]
+    return points / 2.0 ** SOBOL_BITS
+
+
+def primes(count: int) -> List[int]:
+    """
+    The first *count* primes
+    """
+    found = []
+    candidate = 2
+    while len(found) < count:
+        if all(candidate % p != 0 for p in found if p * p <= candidate):
+            found.append(candidate)
+        candidate += 1
+    return found
+
+
+def halton(count: int, dimensions: int, skip: int = 0) -> np.ndarray:
+    """
+    Points of the Halton sequence, the radical inverses of the index in the first *dimensions* primes\n
+    https://en.wikipedia.org/wiki/Halton_sequence
+
+    :param count: Number of points
+    :param dimensions: Dimensions
+    :param skip: Index of the first point
+    :return: (count, dimensions) array of points
+    """
+    points = np.zeros((count, dimensions))
+    for j, base in enumerate(primes(dimensions)):
+        index = np.arange(skip, skip + count, dtype=np.int64)
+        scale = 1.0 / base
+        while np.any(index > 0):
+            points[:, j] += (index % base) * scale
+            index //= base
+            scale /= base
+    return points
+
+
+if __name__ == '__main__':
+    print(sobol(8, 3))
+    print(halton(8, 2))
@@ -1,10 +1,10 @@
 import math
 from decimal import Decimal
 from fractions import Fraction
-from typing import Callable, Tuple
+from typing import Callable, Tuple, List
 
 from mathmatics.calculus.common import sigma
-from mathmatics.calculus.derivative import derivative_fn
+from mathmatics.calculus.derivative import derivatives
 
 __two_pi = 2 * math.pi
 
@@ -67,6 +67,19 @@ def taylor_cos(x: float, precision: int = 7) -> float:
     return sign * result
 
 
+def taylor_coefficients(fn: Callable, a: float, precision: int = 7) -> List[float]:
+    """
+    Returns the coefficients fn^(n)(a) / n! of the taylor series for fn around a,
+    exact when fn is written with DualNumber operations
+
+    :param fn: Function to estimate
+    :param a: A
+    :param precision: Degree of polynomial
+    :return: The coefficients from degree 0 to precision
+    """
+    return [d / math.factorial(n) for n, d in enumerate(derivatives(fn, a, precision))]
+
+
 def taylor_series(fn: Callable, x: float, a: float, precision: int = 7) -> float:
     """
     Returns the evaluated general taylor series for fn at x around a\n
@@ -78,7 +91,8 @@ def taylor_series(fn: Callable, x: float, a: float, precision: int = 7) -> float
     :param precision: Degree of polynomial
     :return: Evaluated taylor series
     """
-    return sigma(lambda n: derivative_fn(fn, degree=n)(a) * ((x - a) ** n / math.factorial(n)), 0, precision)
+    coefficients = taylor_coefficients(fn, a, precision)
+    return sigma(lambda n: coefficients[n] * (x - a) ** n, 0, precision)
 
 
 def taylor_series_fn(fn: Callable, a: float, precision: int = 7) -> Callable:
@@ -91,7 +105,8 @@ def taylor_series_fn(fn: Callable, a: float, precision: int = 7) -> Callable:
     :param precision: Degree of polynomial
     :return: Taylor series for fn around a
     """
-    return lambda x: taylor_series(fn, x, a, precision)
+    coefficients = taylor_coefficients(fn, a, precision)
+    return lambda x: sigma(lambda n: coefficients[n] * (x - a) ** n, 0, precision)
 
 
 # https://codereview.stackexchange.com/questions/66450/simplify-a-fraction/66474
@@ -6,5 +6,9 @@ class VectorIndexOutOfBounds(Exception):
     pass
 
 
+class VectorDimensionMismatch(Exception):
+    pass
+
+
 class DerivativeNegativeDegree(Exception):
     pass
\ No newline at end of file
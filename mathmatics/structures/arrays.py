@@ -0,0 +1,380 @@
+from typing import Sequence, Union, Tuple
+
+import numpy as np
+
+from mathmatics.exceptions.common import VectorDimensionMismatch
+from mathmatics.structures.common import MathObject
+from mathmatics.structures.line import Line2D, Ray2D
+from mathmatics.structures.vector import Vector, VectorND, Vector2D
+
+# Structure of arrays versions of the vector and line classes,
+# every method works on all items at once instead of one python object per item
+
+
+class PointCloud(MathObject):
+    """
+    A collection of n-dimensional points stored in one contiguous (N, d) float64 array
+    """
+    __slots__ = ("points",)
+
+    points: np.ndarray
+
+    def __init__(self, points):
+        points = np.ascontiguousarray(points, dtype=np.float64)
+        if points.ndim != 2:
+            raise VectorDimensionMismatch(f"expected an (N, d) array of points, got shape {points.shape}")
+        self.points = points
+
+    @classmethod
+    def from_vectors(cls, vectors: Sequence[Vector]):
+        return cls([[vector[i] for i in range(vector.size())] for vector in vectors])
+
+    def __len__(self):
+        return self.points.shape[0]
+
+    def __getitem__(self, location):
+        if isinstance(location, (int, np.integer)):
+            return VectorND.from_array(self.points[location])
+        return type(self)(self.points[location])
+
+    def __iter__(self):
+        for i in range(len(self)):
+            yield self[i]
+
+    def __array__(self, dtype=None, copy=None):
+        if dtype is None:
+            return self.points
+        return self.points.astype(dtype)
+
+    def dimensions(self) -> int:
+        return self.points.shape[1]
+
+    def _operand(self, other) -> np.ndarray:
+        if isinstance(other, PointCloud):
+            other = other.points
+        elif isinstance(other, Vector):
+            other = [other[i] for i in range(other.size())]
+
+        other = np.asarray(other, dtype=np.float64)
+        if other.ndim > 0 and other.shape[-1] != self.dimensions():
+            raise VectorDimensionMismatch(f"cannot combine {self.dimensions()}D points with shape {other.shape}")
+        return other
+
+    def __add__(self, other) -> 'PointCloud':
+        return type(self)(self.points + self._operand(other))
+
+    def __sub__(self, other) -> 'PointCloud':
+        return type(self)(self.points - self._operand(other))
+
+    def __mul__(self, other: float) -> 'PointCloud':
+        return type(self)(self.points * other)
+
+    def __truediv__(self, other: float) -> 'PointCloud':
+        return type(self)(self.points / other)
+
+    def magnitude(self) -> np.ndarray:
+        """
+        The euclidean length of every point treated as a vector
+
+        :return: (N,) array of lengths
+        """
+        return np.sqrt(np.einsum('ij,ij->i', self.points, self.points))
+
+    def normalise(self) -> 'PointCloud':
+        with np.errstate(divide='ignore', invalid='ignore'):
+            return type(self)(self.points / self.magnitude()[:, np.newaxis])
+
+    def dot(self, other) -> np.ndarray:
+        """
+        Row-wise dot product with another cloud of the same size, or with a single vector
+
+        :param other: PointCloud, Vector or array
+        :return: (N,) array of dot products
+        """
+        other = self._operand(other)
+        return np.sum(self.points * other, axis=-1)
+
+    def distances(self, point) -> np.ndarray:
+        """
+        Distance from every point to *point*
+
+        :param point: A single point (Vector or sequence)
+        :return: (N,) array of distances
+        """
+        difference = self.points - self._operand(point)
+        return np.sqrt(np.einsum('ij,ij->i', difference, difference))
+
+    def centroid(self) -> VectorND:
+        return VectorND.from_array(self.points.mean(axis=0))
+
+    def mid_point(self, other) -> 'PointCloud':
+        """
+        The midpoints between each point and the matching point in *other*
+        """
+        return type(self)((self.points + self._operand(other)) / 2)
+
+    def bounds(self) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        The axis aligned bounding box of all points
+
+        :return: (lower corner, upper corner)
+        """
+        return self.points.min(axis=0), self.points.max(axis=0)
+
+    def to_latex(self) -> str:
+        return ", ".join("(" + ", ".join(str(value) for value in point) + ")" for point in self.points)
+
+    def __str__(self):
+        return f"PointCloud of {len(self)} {self.dimensions()}D points"
+
+
+class PointCloud2D(PointCloud):
+    """
+    A collection of 2D points stored in one contiguous (N, 2) float64 array
+    """
+    __slots__ = ()
+
+    def __init__(self, points):
+        super().__init__(points)
+        if self.dimensions() != 2:
+            raise VectorDimensionMismatch(f"expected an (N, 2) array of points, got shape {self.points.shape}")
+
+    @staticmethod
+    def from_xy(xs, ys) -> 'PointCloud2D':
+        return PointCloud2D(np.column_stack((xs, ys)))
+
+    @property
+    def x(self) -> np.ndarray:
+        return self.points[:, 0]
+
+    @property
+    def y(self) -> np.ndarray:
+        return self.points[:, 1]
+
+    def __getitem__(self, location):
+        if isinstance(location, (int, np.integer)):
+            x, y = self.points[location]
+            return Vector2D(float(x), float(y))
+        return PointCloud2D(self.points[location])
+
+    def __str__(self):
+        return f"PointCloud2D of {len(self)} points"
+
+
+def _cross(ax, ay, bx, by):
+    return ax * by - ay * bx
+
+
+def _lines_operand(other: Union['LineArray2D', Line2D]) -> Tuple[np.ndarray, np.ndarray]:
+    if isinstance(other, Line2D):
+        return (np.array([[other.start.x, other.start.y]], dtype=np.float64),
+                np.array([[other.end.x, other.end.y]], dtype=np.float64))
+    if isinstance(other, LineArray2D):
+        return other.starts, other.ends
+    raise TypeError("can only intersect with a Line2D or a LineArray2D")
+
+
+class LineArray2D(MathObject):
+    """
+    A collection of 2D line segments stored as two contiguous (N, 2) float64 arrays of start and end points
+    """
+    __slots__ = ("starts", "ends")
+
+    starts: np.ndarray
+    ends: np.ndarray
+
+    def __init__(self, starts, ends):
+        starts = np.ascontiguousarray(starts, dtype=np.float64)
+        ends = np.ascontiguousarray(ends, dtype=np.float64)
+        if starts.shape != ends.shape or starts.ndim != 2 or starts.shape[1] != 2:
+            raise VectorDimensionMismatch(f"expected two (N, 2) arrays, got shapes {starts.shape} and {ends.shape}")
+        self.starts = starts
+        self.ends = ends
+
+    @staticmethod
+    def from_lines(lines: Sequence[Line2D]) -> 'LineArray2D':
+        return LineArray2D([[line.start.x, line.start.y] for line in lines],
+                           [[line.end.x, line.end.y] for line in lines])
+
+    @staticmethod
+    def from_array(segments) -> 'LineArray2D':
+        """
+        Creates the segments from an (N, 4) array of [x1, y1, x2, y2] rows
+
+        :param segments: The segment coordinates
+        :return: The segments
+        """
+        segments = np.asarray(segments, dtype=np.float64)
+        return LineArray2D(segments[:, 0:2], segments[:, 2:4])
+
+    def __len__(self):
+        return self.starts.shape[0]
+
+    def __getitem__(self, location):
+        if isinstance(location, (int, np.integer)):
+            (x1, y1), (x2, y2) = self.starts[location], self.ends[location]
+            return Line2D(Vector2D(float(x1), float(y1)), Vector2D(float(x2), float(y2)))
+        return LineArray2D(self.starts[location], self.ends[location])
+
+    def __iter__(self):
+        for i in range(len(self)):
+            yield self[i]
+
+    def deltas(self) -> np.ndarray:
+        return self.ends - self.starts
+
+    def magnitude(self) -> np.ndarray:
+        delta = self.deltas()
+        return np.hypot(delta[:, 0], delta[:, 1])
+
+    def slope(self) -> np.ndarray:
+        """
+        The slope of every segment, vertical segments have infinite slope
+
+        :return: (N,) array of slopes
+        """
+        delta = self.deltas()
+        with np.errstate(divide='ignore', invalid='ignore'):
+            return delta[:, 1] / delta[:, 0]
+
+    def mid_point(self) -> PointCloud2D:
+        return PointCloud2D((self.starts + self.ends) / 2)
+
+    def y_intercept(self) -> np.ndarray:
+        with np.errstate(invalid='ignore'):
+            return self.starts[:, 1] - self.slope() * self.starts[:, 0]
+
+    def bounds(self) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        The bounding box of every segment
+
+        :return: (N, 2) lower corners and (N, 2) upper corners
+        """
+        return np.minimum(self.starts, self.ends), np.maximum(self.starts, self.ends)
+
+    def to_rays(self) -> 'RayArray2D':
+        return RayArray2D(self.slope(), self.y_intercept())
+
+    def intersects(self, other: Union['LineArray2D', Line2D]) -> np.ndarray:
+        """
+        Tests whether each segment intersects the matching segment in *other*,
+        *other* may be a single line, which is tested against every segment.
+        Touching and overlapping collinear segments count as intersecting
+
+        :param other: A Line2D, or a LineArray2D of the same length
+        :return: (N,) boolean array
+        """
+        p, p2 = self.starts, self.ends
+        q, q2 = _lines_operand(other)
+
+        def orientation(a, b, c):
+            return np.sign(_cross(b[:, 0] - a[:, 0], b[:, 1] - a[:, 1], c[:, 0] - a[:, 0], c[:, 1] - a[:, 1]))
+
+        def on_segment(a, b, c):
+            # c is collinear with a-b, check it lies within the bounding box
+            return ((np.minimum(a[:, 0], b[:, 0]) <= c[:, 0]) & (c[:, 0] <= np.maximum(a[:, 0], b[:, 0])) &
+                    (np.minimum(a[:, 1], b[:, 1]) <= c[:, 1]) & (c[:, 1] <= np.maximum(a[:, 1], b[:, 1])))
+
+        p, p2, q, q2 = np.broadcast_arrays(p, p2, q, q2)
+        o1 = orientation(p, p2, q)
+        o2 = orientation(p, p2, q2)
+        o3 = orientation(q, q2, p)
+        o4 = orientation(q, q2, p2)
+
+        result = (o1 != o2) & (o3 != o4)
+        result |= (o1 == 0) & on_segment(p, p2, q)
+        result |= (o2 == 0) & on_segment(p, p2, q2)
+        result |= (o3 == 0) & on_segment(q, q2, p)
+        result |= (o4 == 0) & on_segment(q, q2, p2)
+        return result
+
+    def intersection(self, other: Union['LineArray2D', Line2D]) -> PointCloud2D:
+        """
+        The intersection point of each segment with the matching segment in *other*,
+        rows are nan when the segments do not cross or are parallel
+
+        :param other: A Line2D, or a LineArray2D of the same length
+        :return: The intersection points
+        """
+        q, q2 = _lines_operand(other)
+        p, p2, q, q2 = np.broadcast_arrays(self.starts, self.ends, q, q2)
+        r = p2 - p
+        s = q2 - q
+        qp = q - p
+
+        denominator = _cross(r[:, 0], r[:, 1], s[:, 0], s[:, 1])
+        with np.errstate(divide='ignore', invalid='ignore'):
+            t = _cross(qp[:, 0], qp[:, 1], s[:, 0], s[:, 1]) / denominator
+            u = _cross(qp[:, 0], qp[:, 1], r[:, 0], r[:, 1]) / denominator
+
+        hit = (denominator != 0) & (t >= 0) & (t <= 1) & (u >= 0) & (u <= 1)
+        points = p + t[:, np.newaxis] * r
+        points[~hit] = np.nan
+        return PointCloud2D(points)
+
+    def to_latex(self) -> str:
+        return ", ".join(f"(({x1}, {y1}), ({x2}, {y2}))" for (x1, y1), (x2, y2) in zip(self.starts, self.ends))
+
+    def __str__(self):
+        return f"LineArray2D of {len(self)} segments"
+
+
+class RayArray2D(MathObject):
+    """
+    A collection of infinite lines y = m * x + c, stored as arrays of gradients and intercepts
+    """
+    __slots__ = ("m", "c")
+
+    m: np.ndarray
+    c: np.ndarray
+
+    def __init__(self, m, c):
+        self.m, self.c = np.broadcast_arrays(np.asarray(m, dtype=np.float64), np.asarray(c, dtype=np.float64))
+
+    @staticmethod
+    def from_rays(rays: Sequence[Ray2D]) -> 'RayArray2D':
+        return RayArray2D([ray.m for ray in rays], [ray.c for ray in rays])
+
+    def __len__(self):
+        return self.m.shape[0]
+
+    def __getitem__(self, location):
+        if isinstance(location, (int, np.integer)):
+            return Ray2D(float(self.m[location]), float(self.c[location]))
+        return RayArray2D(self.m[location], self.c[location])
+
+    def y(self, x) -> np.ndarray:
+        """
+        Evaluates every ray at x, x may be a scalar or an array matching the rays
+
+        :param x: X
+        :return: (N,) array of y values
+        """
+        return self.m * x + self.c
+
+    def intersection(self, other: Union['RayArray2D', Ray2D]) -> PointCloud2D:
+        """
+        The intersection point of each ray with the matching ray in *other*, nan for parallel rays
+
+        :param other: A Ray2D, or a RayArray2D of the same length
+        :return: The intersection points
+        """
+        m, c = (other.m, other.c)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            x = (c - self.c) / (self.m - m)
+        x = np.where(self.m == m, np.nan, x)
+        return PointCloud2D.from_xy(x, self.y(x))
+
+    def to_latex(self) -> str:
+        return ", ".join(f"{m}*x+{c}" for m, c in zip(self.m, self.c))
+
+    def __str__(self):
+        return f"RayArray2D of {len(self)} rays"
+
+
+if __name__ == '__main__':
+    rng = np.random.default_rng(0)
+    segments = LineArray2D(rng.random((5, 2)), rng.random((5, 2)))
+    print(segments.magnitude())
+    print(segments.intersects(Line2D(Vector2D(0, 0), Vector2D(1, 1))))
+    print(segments.intersection(Line2D(Vector2D(0, 0), Vector2D(1, 1))).points)
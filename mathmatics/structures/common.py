@@ -4,6 +4,8 @@ from mathmatics.webserver.desmos import start_desmos
 
 
 class MathObject(ABC):
+    __slots__ = ()
+
     @abstractmethod
     def to_latex(self) -> str:
         pass
@@ -4,8 +4,8 @@ from typing import Callable, Union
 import numpy as np
 import sympy
 
-from mathmatics.calculus.integral import integral
-from mathmatics.calculus.derivative import derivative
+from mathmatics.calculus.quadrature import gauss_legendre
+from mathmatics.calculus.derivative import richardson_derivative
 from mathmatics.structures.common import MathObject
 
 
@@ -30,22 +30,22 @@ class Equation(MathObject, ABC):
 
     def derivative(self, x: float) -> float:
         """
-        Calculates the derivative of this equation at x
+        Calculates the derivative of this equation at x, with central differences and Richardson extrapolation
 
         :param x: X
         :return: The derivative
         """
-        return derivative(self.y, x)
+        return richardson_derivative(self.y, x)[0]
 
     def integral(self, start: float, end: float) -> float:
         """
-        Calculates the definite integral from start to end for this equation
+        Calculates the definite integral from start to end for this equation, with composite Gauss-Legendre quadrature
 
         :param start: Start
         :param end: End
         :return: The definite integral
         """
-        return integral(self.y, start, end)
+        return gauss_legendre(self.y, start, end, n=10, intervals=10)
 
     def to_latex(self) -> Union[str, None]:
         """
@@ -1,6 +1,8 @@
 import math
 from typing import Union, List
 
+import numpy as np
+
 V3 = List[float]
 V2 = List[float]
 
@@ -236,6 +238,293 @@ class Quaternions:
         return f"Quaternion(w={w}, x={x}, y={y}, z={z})"
 
 
+class QuaternionArray:
+    """
+    A batch of N quaternions stored in one (N, 4) float64 array of (w, x, y, z) rows.
+    All operations act on the whole batch at once, see Quaternions for the single quaternion version.
+
+    Operations between two arrays broadcast like numpy, so a single quaternion array of
+    length 1 can be combined with an array of any length
+    """
+    __slots__ = ("_val",)
+
+    _val: np.ndarray
+
+    def __init__(self, values):
+        values = np.array(values, dtype=np.float64)
+        if values.ndim == 1:
+            values = values[np.newaxis, :]
+        if values.ndim != 2 or values.shape[1] != 4:
+            raise ValueError(f"expected an (N, 4) array of quaternions, got shape {values.shape}")
+        self._val = values
+
+    @staticmethod
+    def _wrap(values: np.ndarray) -> "QuaternionArray":
+        # wrap without copying
+        q = QuaternionArray.__new__(QuaternionArray)
+        q._val = values
+        return q
+
+    @staticmethod
+    def from_quaternions(quaternions: List[Quaternions]) -> "QuaternionArray":
+        return QuaternionArray([list(q) for q in quaternions])
+
+    @staticmethod
+    def identity(n: int) -> "QuaternionArray":
+        values = np.zeros((n, 4))
+        values[:, 0] = 1
+        return QuaternionArray._wrap(values)
+
+    @staticmethod
+    def from_axis_angle(theta, unit) -> "QuaternionArray":
+        """
+        Create rotational quaternions from rotation angles and unit axes, counter-clockwise
+
+        :param theta: (N,) rotation amounts
+        :param unit: (N, 3) or (3,) rotation directions
+        :return: The rotational quaternions
+        """
+        theta = np.asarray(theta, dtype=np.float64).reshape(-1)
+        unit = np.atleast_2d(np.asarray(unit, dtype=np.float64))
+        half = theta / 2
+        w = np.cos(half)
+        v = np.sin(half)[:, np.newaxis] * unit
+        w, v = np.broadcast_arrays(w[:, np.newaxis], v)
+        return QuaternionArray._wrap(np.concatenate((w[:, :1], v), axis=1))
+
+    @property
+    def values(self) -> np.ndarray:
+        return self._val
+
+    def scalar(self) -> np.ndarray:
+        return self._val[:, 0]
+
+    def vector(self) -> np.ndarray:
+        return self._val[:, 1:]
+
+    def __len__(self):
+        return self._val.shape[0]
+
+    def __getitem__(self, location):
+        if isinstance(location, (int, np.integer)):
+            return Quaternions(*self._val[location].tolist())
+        return QuaternionArray._wrap(self._val[location])
+
+    def __iter__(self):
+        for i in range(len(self)):
+            yield self[i]
+
+    def __array__(self, dtype=None, copy=None):
+        if dtype is None:
+            return self._val
+        return self._val.astype(dtype)
+
+    def __neg__(self):
+        return QuaternionArray._wrap(-self._val)
+
+    def __add__(self, other: Union["QuaternionArray", float, int]):
+        if isinstance(other, QuaternionArray):
+            return QuaternionArray._wrap(self._val + other._val)
+        if isinstance(other, (float, int)):
+            return QuaternionArray._wrap(self._val + other)
+
+        raise TypeError("can only add a quaternion array by a scaler or another quaternion array")
+
+    def __sub__(self, other: Union["QuaternionArray", float, int]):
+        return self + -other
+
+    def __mul__(self, other: Union["QuaternionArray", float, int]):
+        """
+        The Hamilton product of each pair of quaternions, or scaling by a scaler
+        """
+        if isinstance(other, (float, int)):
+            return QuaternionArray._wrap(self._val * other)
+
+        if isinstance(other, QuaternionArray):
+            a1, b1, c1, d1 = self._val.T
+            a2, b2, c2, d2 = other._val.T
+            return QuaternionArray._wrap(np.stack((
+                a1 * a2 - b1 * b2 - c1 * c2 - d1 * d2,
+                a1 * b2 + b1 * a2 + c1 * d2 - d1 * c2,
+                a1 * c2 - b1 * d2 + c1 * a2 + d1 * b2,
+                a1 * d2 + b1 * c2 - c1 * b2 + d1 * a2
+            ), axis=1))
+
+        raise TypeError("can only multiply a quaternion array by a scaler or another quaternion array")
+
+    def __truediv__(self, other: Union[float, int, np.ndarray]):
+        if isinstance(other, np.ndarray):
+            return QuaternionArray._wrap(self._val / other.reshape(-1, 1))
+        if isinstance(other, (float, int)):
+            return QuaternionArray._wrap(self._val / other)
+
+        # no division of other quaternions, because ambiguity of order
+
+        raise TypeError("can only divide a quaternion array by scalers")
+
+    def dot(self, other: "QuaternionArray") -> np.ndarray:
+        if isinstance(other, QuaternionArray):
+            return np.sum(self._val * other._val, axis=1)
+
+        raise TypeError("can only dot a quaternion array by another quaternion array")
+
+    def norm(self) -> np.ndarray:
+        return np.sqrt(np.einsum('ij,ij->i', self._val, self._val))
+
+    def unit(self) -> "QuaternionArray":
+        return self / self.norm()
+
+    normalise = unit
+
+    def conjugate(self) -> "QuaternionArray":
+        return QuaternionArray._wrap(self._val * np.array([1, -1, -1, -1]))
+
+    def reciprocal(self) -> "QuaternionArray":
+        return self.conjugate() / np.einsum('ij,ij->i', self._val, self._val)
+
+    ### ROTATIONS ###
+    def compose(self, other: "QuaternionArray") -> "QuaternionArray":
+        """
+        The rotations of *other* followed by the rotations of this array
+
+        :param other: The first rotations
+        :return: The combined rotations
+        """
+        return self * other
+
+    def rotate(self, theta, unit) -> "QuaternionArray":
+        """
+        Returns the current rotations plus a rotation around the unit vectors by angles theta, counter-clockwise
+
+        :param theta: Rotation amounts
+        :param unit: Rotation directions
+        :return:
+        """
+        return QuaternionArray.from_axis_angle(theta, unit) * self
+
+    def rotate_points(self, points) -> np.ndarray:
+        """
+        Rotate an (M, 3) array of points by unit quaternions.
+        An array of one quaternion rotates every point, otherwise the i-th quaternion rotates the i-th point
+
+        :param points: (M, 3) points to be rotated
+        :return: (M, 3) rotated points
+        """
+        points = np.atleast_2d(np.asarray(points, dtype=np.float64))
+        if len(self) not in (1, points.shape[0]):
+            raise ValueError(f"cannot rotate {points.shape[0]} points by {len(self)} quaternions")
+
+        w = self._val[:, :1]
+        u = self._val[:, 1:]
+        # v' = v + w * t + u x t, where t = 2 * u x v
+        t = 2 * np.cross(u, points)
+        return points + w * t + np.cross(u, t)
+
+    def slerp(self, other: "QuaternionArray", t) -> "QuaternionArray":
+        """
+        Spherical linear interpolation from each unit quaternion to the matching one in *other*
+
+        :param other: The end orientations
+        :param t: Interpolation amount, 0 gives this array and 1 gives *other*, may be an (N,) array
+        :return: The interpolated unit quaternions
+        """
+        t = np.asarray(t, dtype=np.float64).reshape(-1, 1)
+        start = self._val
+        end = other._val
+        cos_theta = np.sum(start * end, axis=1, keepdims=True)
+
+        # take the shortest path
+        end = np.where(cos_theta < 0, -end, end)
+        cos_theta = np.abs(cos_theta)
+
+        theta = np.arccos(np.clip(cos_theta, -1, 1))
+        sin_theta = np.sin(theta)
+        close = sin_theta < 1e-6
+        safe = np.where(close, 1, sin_theta)
+
+        a = np.where(close, 1 - t, np.sin((1 - t) * theta) / safe)
+        b = np.where(close, t, np.sin(t * theta) / safe)
+        return QuaternionArray._wrap(a * start + b * end).unit()
+
+    def to_matrices(self) -> np.ndarray:
+        """
+        Converts the unit quaternions to rotation matrices
+
+        :return: (N, 3, 3) rotation matrices
+        """
+        w, x, y, z = self._val.T
+        return np.stack((
+            np.stack((1 - 2 * (y * y + z * z), 2 * (x * y - z * w), 2 * (x * z + y * w)), axis=1),
+            np.stack((2 * (x * y + z * w), 1 - 2 * (x * x + z * z), 2 * (y * z - x * w)), axis=1),
+            np.stack((2 * (x * z - y * w), 2 * (y * z + x * w), 1 - 2 * (x * x + y * y)), axis=1),
+        ), axis=1)
+
+    @staticmethod
+    def from_matrices(matrices) -> "QuaternionArray":
+        """
+        Converts rotation matrices to unit quaternions, picking the numerically stable branch per matrix
+
+        :param matrices: (N, 3, 3) rotation matrices
+        :return: The unit quaternions
+        """
+        m = np.asarray(matrices, dtype=np.float64).reshape(-1, 3, 3)
+        m00, m11, m22 = m[:, 0, 0], m[:, 1, 1], m[:, 2, 2]
+        trace = m00 + m11 + m22
+
+        # each candidate is accurate when its leading component is large
+        candidates = np.stack((
+            np.stack((1 + trace, m[:, 2, 1] - m[:, 1, 2], m[:, 0, 2] - m[:, 2, 0], m[:, 1, 0] - m[:, 0, 1]), axis=1),
+            np.stack((m[:, 2, 1] - m[:, 1, 2], 1 + m00 - m11 - m22, m[:, 0, 1] + m[:, 1, 0], m[:, 0, 2] + m[:, 2, 0]), axis=1),
+            np.stack((m[:, 0, 2] - m[:, 2, 0], m[:, 0, 1] + m[:, 1, 0], 1 - m00 + m11 - m22, m[:, 1, 2] + m[:, 2, 1]), axis=1),
+            np.stack((m[:, 1, 0] - m[:, 0, 1], m[:, 0, 2] + m[:, 2, 0], m[:, 1, 2] + m[:, 2, 1], 1 - m00 - m11 + m22), axis=1),
+        ), axis=1)
+        branch = np.argmax(np.stack((trace, m00, m11, m22), axis=1), axis=1)
+        values = candidates[np.arange(len(m)), branch]
+        return QuaternionArray._wrap(values).unit()
+
+    @staticmethod
+    def from_euler(yaw, pitch, roll) -> "QuaternionArray":
+        """
+        Create orientations from intrinsic z-y-x euler angles, yaw around +z, then pitch around +y, then roll around +x
+
+        :param yaw: (N,) yaw angles
+        :param pitch: (N,) pitch angles
+        :param roll: (N,) roll angles
+        :return: The orientation quaternions
+        """
+        yaw, pitch, roll = np.broadcast_arrays(*(np.asarray(a, dtype=np.float64).reshape(-1) for a in (yaw, pitch, roll)))
+        cy, sy = np.cos(yaw / 2), np.sin(yaw / 2)
+        cp, sp = np.cos(pitch / 2), np.sin(pitch / 2)
+        cr, sr = np.cos(roll / 2), np.sin(roll / 2)
+        return QuaternionArray._wrap(np.stack((
+            cr * cp * cy + sr * sp * sy,
+            sr * cp * cy - cr * sp * sy,
+            cr * sp * cy + sr * cp * sy,
+            cr * cp * sy - sr * sp * cy
+        ), axis=1))
+
+    def to_euler(self) -> np.ndarray:
+        """
+        Returns the intrinsic z-y-x euler angles of the unit quaternions, the inverse of from_euler
+
+        :return: (N, 3) array of (yaw, pitch, roll) rows
+        """
+        w, x, y, z = self._val.T
+        yaw = np.arctan2(2 * (w * z + x * y), 1 - 2 * (y * y + z * z))
+        pitch = np.arcsin(np.clip(2 * (w * y - z * x), -1, 1))
+        roll = np.arctan2(2 * (w * x + y * z), 1 - 2 * (x * x + y * y))
+        return np.stack((yaw, pitch, roll), axis=1)
+
+    def to_euler_degrees(self) -> np.ndarray:
+        return np.degrees(self.to_euler())
+
+    def __str__(self):
+        return f"QuaternionArray of {len(self)} quaternions"
+
+    def __repr__(self):
+        return f"QuaternionArray({self._val.tolist()})"
+
+
 if __name__ == '__main__':
     basis = [1, 0, 0]
     q = Quaternions.rotate_quaternion(0, basis)
@@ -244,3 +533,7 @@ if __name__ == '__main__':
     print("Rotating")
     q = q.rotate(math.pi / 3, [0, 0, 1])
     print(f"Rotated Angle {q.euler_angles_degrees(basis)}")
+
+    qs = QuaternionArray.from_axis_angle(np.linspace(0, math.pi, 5), [0, 0, 1])
+    print(qs.rotate_points(np.tile(basis, (5, 1))))
+    print(qs.to_euler_degrees())
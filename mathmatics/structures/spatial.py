@@ -0,0 +1,249 @@
+import math
+from typing import Sequence, Union, Tuple
+
+import numpy as np
+from scipy.spatial import cKDTree
+
+from mathmatics.structures.arrays import PointCloud, LineArray2D
+from mathmatics.structures.line import Line2D
+from mathmatics.structures.vector import Vector
+
+# Spatial indexes answering geometry queries without all-pairs checks
+
+
+def _as_point(point) -> np.ndarray:
+    if isinstance(point, Vector):
+        point = [point[i] for i in range(point.size())]
+    return np.asarray(point, dtype=np.float64)
+
+
+class PointIndex:
+    """
+    A k-d tree over a collection of points for nearest neighbour and range queries.
+    Query results are indices into the original collection
+    """
+
+    def __init__(self, points: Union[PointCloud, Sequence[Vector], np.ndarray]):
+        if isinstance(points, PointCloud):
+            self.points = points
+        elif len(points) > 0 and isinstance(points[0], Vector):
+            self.points = PointCloud.from_vectors(points)
+        else:
+            self.points = PointCloud(points)
+
+        self._tree = cKDTree(self.points.points)
+
+    def __len__(self):
+        return len(self.points)
+
+    def nearest(self, point, k: int = 1) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Finds the k points closest to *point*
+
+        :param point: The query point, or an (M, d) array of query points
+        :param k: Number of neighbours
+        :return: (distances, indices), sorted from closest to furthest
+        """
+        return self._tree.query(_as_point(point), k=k)
+
+    def within_radius(self, point, radius: float) -> np.ndarray:
+        """
+        Finds the points within *radius* of *point*
+
+        :param point: The query point
+        :param radius: The search radius
+        :return: Indices of the points
+        """
+        return np.asarray(self._tree.query_ball_point(_as_point(point), radius), dtype=np.intp)
+
+    def within_box(self, lower, upper) -> np.ndarray:
+        """
+        Finds the points inside the axis aligned box from *lower* to *upper*
+
+        :param lower: The lower corner
+        :param upper: The upper corner
+        :return: Indices of the points
+        """
+        lower = _as_point(lower)
+        upper = _as_point(upper)
+        centre = (lower + upper) / 2
+        # the chebyshev ball around the centre contains the box
+        candidates = self._within_chebyshev(centre, np.max(upper - lower) / 2)
+        inside = np.all((self.points.points[candidates] >= lower) & (self.points.points[candidates] <= upper), axis=1)
+        return candidates[inside]
+
+    def _within_chebyshev(self, point, radius: float) -> np.ndarray:
+        return np.asarray(self._tree.query_ball_point(_as_point(point), radius, p=np.inf), dtype=np.intp)
+
+    def pairs_within(self, radius: float) -> np.ndarray:
+        """
+        Finds every pair of points closer than *radius*
+
+        :param radius: The distance
+        :return: (P, 2) array of index pairs i < j
+        """
+        return self._tree.query_pairs(radius, output_type='ndarray')
+
+
+def _point_segment_distances(point: np.ndarray, starts: np.ndarray, ends: np.ndarray) -> np.ndarray:
+    delta = ends - starts
+    length = np.einsum('ij,ij->i', delta, delta)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        t = np.einsum('ij,ij->i', point - starts, delta) / length
+    t = np.clip(np.nan_to_num(t), 0, 1)
+    closest = starts + t[:, np.newaxis] * delta
+    return np.hypot(*(closest - point).T)
+
+
+class SegmentIndex:
+    """
+    A uniform grid over a collection of 2D line segments.
+
+    Every segment is registered in the cells its bounding box covers,
+    the cell contents are stored as a compressed array (cell offsets into one sorted array of segment indices)
+    """
+
+    def __init__(self, segments: Union[LineArray2D, Sequence[Line2D]], cell_size: float = None):
+        """
+        :param segments: The segments to index
+        :param cell_size: The width of a grid cell, defaults to the mean segment length
+        """
+        if not isinstance(segments, LineArray2D):
+            segments = LineArray2D.from_lines(segments)
+        self.segments = segments
+
+        lower, upper = segments.bounds()
+        self.origin = lower.min(axis=0) if len(segments) > 0 else np.zeros(2)
+        extent = (upper.max(axis=0) if len(segments) > 0 else np.ones(2)) - self.origin
+
+        if cell_size is None:
+            cell_size = float(np.mean(segments.magnitude())) if len(segments) > 0 else 1.0
+            # keep the grid to roughly one cell per segment for degenerate inputs
+            cell_size = max(cell_size, math.sqrt(max(extent[0] * extent[1], 1e-300) / max(len(segments), 1)), 1e-12)
+        self.cell_size = cell_size
+        self.shape = np.maximum(np.ceil(extent / cell_size).astype(np.intp), 1)
+
+        low_cells = self._cell(lower)
+        high_cells = self._cell(upper)
+        spans = high_cells - low_cells + 1
+        counts = spans[:, 0] * spans[:, 1]
+
+        # expand every segment into the cells of its bounding box
+        owners = np.repeat(np.arange(len(segments)), counts)
+        local = np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts, counts)
+        xs = low_cells[owners, 0] + local % spans[owners, 0]
+        ys = low_cells[owners, 1] + local // spans[owners, 0]
+        cells = ys * self.shape[0] + xs
+
+        order = np.argsort(cells, kind='stable')
+        self._cells = cells[order]
+        self._entries = owners[order]
+        self._offsets = np.searchsorted(self._cells, np.arange(self.shape[0] * self.shape[1] + 1))
+
+    def __len__(self):
+        return len(self.segments)
+
+    def _cell(self, points: np.ndarray) -> np.ndarray:
+        cells = np.floor((points - self.origin) / self.cell_size).astype(np.intp)
+        return np.clip(cells, 0, self.shape - 1)
+
+    def _candidates(self, lower, upper) -> np.ndarray:
+        (x0, y0), (x1, y1) = self._cell(np.asarray(lower)), self._cell(np.asarray(upper))
+        rows = np.arange(y0, y1 + 1) * self.shape[0]
+        starts = self._offsets[rows + x0]
+        ends = self._offsets[rows + x1 + 1]
+        if len(starts) == 0:
+            return np.empty(0, dtype=np.intp)
+        entries = np.concatenate([self._entries[s:e] for s, e in zip(starts, ends)])
+        return np.unique(entries)
+
+    def within_box(self, lower, upper) -> np.ndarray:
+        """
+        Finds the segments whose bounding box overlaps the box from *lower* to *upper*
+
+        :param lower: The lower corner
+        :param upper: The upper corner
+        :return: Indices of the segments
+        """
+        lower = _as_point(lower)
+        upper = _as_point(upper)
+        candidates = self._candidates(lower, upper)
+        low, high = self.segments[candidates].bounds()
+        overlap = np.all((low <= upper) & (high >= lower), axis=1)
+        return candidates[overlap]
+
+    def intersecting(self, line: Line2D) -> np.ndarray:
+        """
+        Finds the segments that intersect *line*
+
+        :param line: The query segment
+        :return: Indices of the segments
+        """
+        start = _as_point(line.start)
+        end = _as_point(line.end)
+        candidates = self._candidates(np.minimum(start, end), np.maximum(start, end))
+        return candidates[self.segments[candidates].intersects(line)]
+
+    def nearest(self, point) -> Tuple[float, int]:
+        """
+        Finds the segment closest to *point*, searching outwards ring by ring from the point's cell
+
+        :param point: The query point
+        :return: (distance, index) of the closest segment
+        """
+        if len(self.segments) == 0:
+            raise ValueError("cannot search an empty index")
+
+        point = _as_point(point)
+        # the search box is clipped to the grid, so start from the point's distance to it
+        grid_upper = self.origin + self.shape * self.cell_size
+        outside = float(np.max(np.maximum(np.maximum(self.origin - point, point - grid_upper), 0)))
+        radius = int(outside // self.cell_size)
+        while True:
+            reach = radius * self.cell_size
+            candidates = self._candidates(point - reach, point + reach)
+            covers_grid = bool(np.all(point - reach <= self.origin) and np.all(point + reach >= grid_upper))
+            if len(candidates) > 0:
+                distances = _point_segment_distances(point, self.segments.starts[candidates],
+                                                     self.segments.ends[candidates])
+                best = int(np.argmin(distances))
+                # anything outside the searched box is at least *reach* away
+                if distances[best] <= reach or covers_grid:
+                    return float(distances[best]), int(candidates[best])
+            radius += 1
+
+    def intersecting_pairs(self) -> np.ndarray:
+        """
+        Finds every pair of intersecting segments, only segments sharing a grid cell are tested
+
+        :return: (P, 2) array of index pairs i < j
+        """
+        counts = np.diff(self._offsets)
+        cell_ends = np.repeat(self._offsets[1:], counts)
+        partners = cell_ends - np.arange(len(self._entries)) - 1
+
+        # pair each entry with the entries after it in the same cell
+        first = np.repeat(np.arange(len(self._entries)), partners)
+        second = first + 1 + np.arange(partners.sum()) - np.repeat(np.cumsum(partners) - partners, partners)
+        a = self._entries[first]
+        b = self._entries[second]
+        pairs = np.unique(np.stack((np.minimum(a, b), np.maximum(a, b)), axis=1), axis=0)
+        pairs = pairs[pairs[:, 0] != pairs[:, 1]]
+
+        hits = self.segments[pairs[:, 0]].intersects(self.segments[pairs[:, 1]])
+        return pairs[hits]
+
+
+if __name__ == '__main__':
+    from mathmatics.structures.vector import Vector2D
+
+    rng = np.random.default_rng(0)
+    starts = rng.random((10000, 2)) * 100
+    segments = LineArray2D(starts, starts + rng.normal(size=(10000, 2)))
+    index = SegmentIndex(segments)
+    print(len(index.intersecting_pairs()))
+    print(index.intersecting(Line2D(Vector2D(0, 0), Vector2D(100, 100))))
+    print(index.nearest(Vector2D(50, 50)))
+
+    points = PointIndex(rng.random((10000, 2)) * 100)
+    print(points.nearest(Vector2D(50, 50), k=3))
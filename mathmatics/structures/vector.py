@@ -1,7 +1,9 @@
 from abc import ABC, abstractmethod
-from typing import List, Tuple
+from typing import List, Tuple, Any, Union
 
-from mathmatics.exceptions.common import VectorIndexOutOfBounds
+import numpy as np
+
+from mathmatics.exceptions.common import VectorIndexOutOfBounds, VectorDimensionMismatch
 from mathmatics.structures.common import MathObject
 
 
@@ -9,6 +11,8 @@ class Vector(MathObject, ABC):
     """
     Generic vector class
     """
+    __slots__ = ()
+
     symbols = ["x", "y", "z", "w"]
 
     @abstractmethod
@@ -26,10 +30,16 @@ class Vector(MathObject, ABC):
 
 class VectorND(Vector):
     """
-    An n-dimensional vector
+    An n-dimensional vector, backed by a float64 numpy array.
+    Vectors made from integers still print their components as integers
     """
+    __slots__ = ("values", "_integral")
+
+    values: np.ndarray
+
     def __init__(self, *values: float):
-        self.values = [*values]
+        self.values = np.array(values, dtype=np.float64)
+        self._integral = all(isinstance(value, (int, np.integer)) for value in values)
 
     @staticmethod
     def from_tuple(values: Tuple):
@@ -39,6 +49,37 @@ class VectorND(Vector):
     def from_list(values: List):
         return VectorND(*values)
 
+    @staticmethod
+    def from_array(values: Any) -> 'VectorND':
+        """
+        Creates a vector that shares memory with an existing array when possible,
+        a copy is only made if the array is not a one dimensional float64 array
+
+        :param values: A numpy array, or anything supporting the buffer protocol
+        :return: The vector
+        """
+        integral = np.asarray(values).dtype.kind in 'iu'
+        array = np.asarray(values, dtype=np.float64)
+        if array.ndim != 1:
+            raise VectorDimensionMismatch(f"expected a one dimensional array, got shape {array.shape}")
+
+        vector = VectorND.__new__(VectorND)
+        vector.values = array
+        vector._integral = integral
+        return vector
+
+    @staticmethod
+    def from_buffer(buffer: Any, count: int = -1, offset: int = 0) -> 'VectorND':
+        """
+        Creates a vector viewing a raw buffer of float64s (bytes, array.array('d'), mmap, ...) without copying
+
+        :param buffer: Object exposing the buffer protocol
+        :param count: Number of items to read, -1 reads the whole buffer
+        :param offset: Start reading the buffer from this byte offset
+        :return: The vector
+        """
+        return VectorND.from_array(np.frombuffer(buffer, dtype=np.float64, count=count, offset=offset))
+
     def __getitem__(self, location: int):
         try:
             return self.values[location]
@@ -48,6 +89,20 @@ class VectorND(Vector):
     def size(self) -> int:
         return len(self.values)
 
+    def __len__(self):
+        return len(self.values)
+
+    def __iter__(self):
+        return iter(self.values)
+
+    def __array__(self, dtype=None, copy=None):
+        if dtype is None:
+            return self.values
+        return self.values.astype(dtype)
+
+    def to_numpy(self) -> np.ndarray:
+        return self.values
+
     def x(self):
         try:
             return self.values[0]
@@ -66,9 +121,106 @@ class VectorND(Vector):
         except IndexError:
             raise VectorIndexOutOfBounds("z out of bounds")
 
+    ### ARITHMETIC ###
+    def _operand(self, other: Union['VectorND', float, int]):
+        if isinstance(other, VectorND):
+            if other.size() != self.size():
+                raise VectorDimensionMismatch(f"cannot combine vectors of size {self.size()} and {other.size()}")
+            return other.values
+
+        if isinstance(other, np.ndarray) and other.ndim == 1:
+            if len(other) != self.size():
+                raise VectorDimensionMismatch(f"cannot combine vectors of size {self.size()} and {len(other)}")
+            return other
+
+        if isinstance(other, (float, int, np.number)) or (isinstance(other, np.ndarray) and other.ndim == 0):
+            return other
+
+        raise TypeError("can only combine a vector with a scalar, a one dimensional array or another vector")
+
+    def __add__(self, other: Union['VectorND', float, int]) -> 'VectorND':
+        return VectorND.from_array(self.values + self._operand(other))
+
+    def __radd__(self, other: Union[float, int]) -> 'VectorND':
+        return self + other
+
+    def __sub__(self, other: Union['VectorND', float, int]) -> 'VectorND':
+        return VectorND.from_array(self.values - self._operand(other))
+
+    def __rsub__(self, other: Union[float, int]) -> 'VectorND':
+        return VectorND.from_array(self._operand(other) - self.values)
+
+    def __mul__(self, other: Union['VectorND', float, int]) -> 'VectorND':
+        """
+        Scales the vector, or multiplies element-wise when given another vector
+        """
+        return VectorND.from_array(self.values * self._operand(other))
+
+    def __rmul__(self, other: Union[float, int]) -> 'VectorND':
+        return self * other
+
+    def __truediv__(self, other: Union['VectorND', float, int]) -> 'VectorND':
+        return VectorND.from_array(self.values / self._operand(other))
+
+    def __neg__(self) -> 'VectorND':
+        return VectorND.from_array(-self.values)
+
+    def __eq__(self, other):
+        if not isinstance(other, VectorND):
+            return NotImplemented
+        return self.size() == other.size() and bool(np.all(self.values == other.values))
+
+    def __hash__(self):
+        # consistent with ==, so a vector should not be changed in place while it is a dict key or in a set
+        return hash(tuple(self.values.tolist()))
+
+    def dot(self, other: 'VectorND') -> float:
+        return float(np.dot(self.values, self._operand(other)))
+
+    def cross(self, other: 'VectorND') -> 'VectorND':
+        """
+        The cross product of two 3D vectors
+
+        :param other: The right hand side vector
+        :return: The vector perpendicular to both vectors
+        """
+        if self.size() != 3:
+            raise VectorDimensionMismatch("the cross product is only defined for 3D vectors")
+        return VectorND.from_array(np.cross(self.values, self._operand(other)))
+
+    def norm(self, order: float = 2) -> float:
+        """
+        The length of the vector, using the *order* norm
+
+        :param order: 2 for euclidean length, 1 for manhattan, np.inf for the max norm
+        :return: The norm
+        """
+        return float(np.linalg.norm(self.values, ord=order))
+
+    def magnitude(self) -> float:
+        return self.norm()
+
+    def normalise(self) -> 'VectorND':
+        """
+        Returns the unit vector pointing in the same direction
+
+        :return: The unit vector
+        """
+        length = self.norm()
+        if length == 0:
+            raise ZeroDivisionError("cannot normalise a zero vector")
+        return self / length
+
+    def _components(self) -> List[Union[float, int]]:
+        # python numbers, so they print as they did before the values were stored in an array
+        components = self.values.tolist()
+        if self._integral:
+            return [int(value) for value in components]
+        return components
+
     def to_latex(self) -> str:
         result = "["
-        for index, value in enumerate(self.values):
+        for index, value in enumerate(self._components()):
 
             result += str(value)
             if index != len(self.values) - 1:
@@ -77,7 +229,7 @@ class VectorND(Vector):
 
     def __str__(self):
         result = "Vector "
-        for index, value in enumerate(self.values):
+        for index, value in enumerate(self._components()):
             if index in range(0, len(Vector.symbols)):
                 result += f"{Vector.symbols[index]}: {value}"
             else:
@@ -86,6 +238,9 @@ class VectorND(Vector):
                 result += ", "
         return result
 
+    def __repr__(self):
+        return f"VectorND({', '.join(str(value) for value in self._components())})"
+
 
 class Vector2D(Vector):
     """
@@ -113,4 +268,5 @@ class Vector2D(Vector):
 
 if __name__ == '__main__':
     vect = VectorND.from_tuple((1, 2, 3, 5))
+    print(vect + vect * 2, vect.norm(), vect.normalise())
     print(vect.open_in_desmos())
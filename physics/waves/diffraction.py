@@ -6,9 +6,7 @@ from utilities.markers import Proxy
 
 def _slit_function(b):
     def f(t):
-        if abs(t) <= b / 2:
-            return 1
-        return 0
+        return np.where(np.abs(t) <= b / 2, 1.0, 0.0)
 
     return f
 
@@ -35,7 +33,7 @@ def single_slit(view_width: float, gap_width: float, dx: float = 0.01):
     # plot slit
     slit = _slit_function(gap_width)
     xs = np.arange(-half_vw, half_vw, dx)
-    ys = np.array([slit(x) for x in xs])
+    ys = slit(xs)
     axs[0].plot(xs, ys)
     # set subplot title, x and y labels
     axs[0].set_title("Single Slit Aperture (Transmission) Function")
@@ -44,7 +42,8 @@ def single_slit(view_width: float, gap_width: float, dx: float = 0.01):
 
 
     xs = np.arange(-half_vw, half_vw, dx)
-    ys = np.array([fourier_transform(slit, x).real ** 2 for x in xs])
+    # the slit is sampled once and every position is transformed together
+    ys = fourier_transform(slit, xs).real ** 2
     axs[1].plot(xs, ys)
     axs[1].set_title("Single Slit Interference Intensity Function")
     axs[1].set_ylabel("Intensity")
@@ -0,0 +1,40 @@
+import numpy as np
+import pytest
+from scipy.integrate import solve_ivp
+
+from mathmatics.calculus.autodif import Dual
+from mathmatics.calculus.diffsolver import BackwardEulerMethod, BDFMethod, RosenbrockMethod
+
+
+def arrhenius(t, y):
+    # a stiff first order reaction with an arrhenius rate, relaxing towards a slowly moving equilibrium
+    return -1e3 * np.exp(-2 / (1 + y)) * (y - 0.5 - 0.2 * np.sin(t))
+
+
+def arrhenius_dual(t, y):
+    return -1e3 * Dual.exp(-2 / (1 + y)) * (y - 0.5 - 0.2 * Dual.sin(t))
+
+
+@pytest.mark.parametrize('solver, tolerance', [
+    (BackwardEulerMethod(0.01, jacobian='dual'), 1e-5),
+    (BDFMethod(0.01, order=3, jacobian='dual'), 1e-6),
+    (RosenbrockMethod(0.01, jacobian='dual'), 1e-5),
+])
+@pytest.mark.parametrize('equation', [arrhenius, arrhenius_dual])
+def test_dual_jacobian_transcendental(solver, tolerance, equation):
+    trajectory = solver.solve(equation, 2.0, 0, 1, save_every=None)
+    t, y = trajectory.ts[-1], trajectory.ys[-1]
+
+    reference = solve_ivp(arrhenius, (0, t), [2.0], method='Radau', rtol=1e-12, atol=1e-12)
+    assert np.isfinite(y)
+    assert abs(y - reference.y[0, -1]) < tolerance
+
+
+def test_dual_jacobian_matches_finite_differences():
+    # a second order equation, on the state [q, q']
+    def equation(t, q):
+        return -np.exp(q[0]) - q[1]
+
+    dual = BDFMethod(0.01, order=2, jacobian='dual').solve(equation, np.array([0.5, 0.0]), 0, 1, save_every=None)
+    numerical = BDFMethod(0.01, order=2).solve(equation, np.array([0.5, 0.0]), 0, 1, save_every=None)
+    assert np.allclose(dual.ys[-1], numerical.ys[-1], atol=1e-8)